@@ -0,0 +1,200 @@
+"""
+End-to-end benchmark: one poll cycle (fetch -> store -> diff -> announce).
+
+Points the bot's fetchers at bench/stub_stores.py, drives the scheduler's
+per-(source, region) job for every region exactly as the poller would, and
+delivers announcements into fake Discord channels. Each configuration runs
+a cold cycle (empty DB and caches) and a warm one (fetched results expired,
+Steam cache and Epic validators kept), and reports wall time, requests made,
+DB operations and messages sent.
+
+Run from the repo root:
+  python bench/bench_poll_cycle.py [--guilds 1,100,5000] [--regions 30]
+                                   [--steam-results 500] [--latency-ms 20]
+                                   [--rate-limit 0.0] [--host-rate 0]
+"""
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("METRICS_PORT", "0")
+
+import bot  # noqa: E402
+from stub_stores import StubStores  # noqa: E402
+
+REGION_CODES = (
+    "US GB DE FR ES IT NL SE NO FI DK PL CZ AT CH BE PT IE BR MX "
+    "CA AU NZ JP KR IN TR ZA AR CL"
+).split()
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+
+
+class FakeChannel:
+    """Announcement sink: counts what the dispatcher would post to Discord."""
+
+    def __init__(self, channel_id: int, guild: FakeGuild, sink: Dict[str, int]):
+        self.id = channel_id
+        self.guild = guild
+        self._sink = sink
+
+    async def send(self, content=None, embeds=None):
+        await asyncio.sleep(0)
+        self._sink["messages"] += 1
+        self._sink["embeds"] += len(embeds or ())
+
+
+def plan(guilds: int, regions: int, sink: Dict[str, int]) -> Dict[str, List[FakeChannel]]:
+    """Guild i announces in region i % regions, mirroring plan_region_fetches' output."""
+    codes = REGION_CODES[: max(1, min(regions, guilds, len(REGION_CODES)))]
+    out: Dict[str, List[FakeChannel]] = {}
+    for i in range(guilds):
+        g = FakeGuild(10_000 + i)
+        out.setdefault(codes[i % len(codes)], []).append(FakeChannel(20_000 + i, g, sink))
+    return out
+
+
+def reset_bot_state(db_path: str):
+    bot.DB = bot.Database(db_path)
+    bot.DISPATCHER = bot.AnnouncementDispatcher(bot.ANNOUNCE_WORKERS)
+    bot.HTTP_VALIDATORS.clear()
+    bot.REGION_SNAPSHOTS.clear()
+    bot._stored_results.clear()
+
+
+def counters() -> Dict[str, float]:
+    m = bot.METRICS
+    http = m.counters.get("http_requests_total", {})
+    db = m.histograms.get("db_seconds", {})
+
+    def db_ops(op: str) -> float:
+        return sum(sum(h[:-1]) for labels, h in db.items() if ("op", op) in labels)
+
+    return {
+        "requests": sum(http.values()),
+        "http_429": sum(v for labels, v in http.items() if ("status", "429") in labels),
+        "http_errors": sum(
+            v for labels, v in http.items() if not dict(labels)["status"].startswith(("2", "3"))
+        ),
+        "db_reads": db_ops("read"),
+        "db_transactions": db_ops("transaction"),
+    }
+
+
+async def run_cycle(scheduler: "bot.PollScheduler", regions: Dict[str, List[FakeChannel]]):
+    sem = asyncio.Semaphore(bot.REGION_FETCH_CONCURRENCY)
+    await asyncio.gather(
+        *(scheduler._run_job(sem, source, region) for region in regions for source in bot.SOURCES)
+    )
+    # Delivery is part of the cycle: wait until every queued message reached a
+    # channel and was written to the ledger (without waiting out the flush timer)
+    await bot.DISPATCHER._ready.join()
+    await bot.DISPATCHER.flush_ledger()
+
+
+async def run_config(stub: StubStores, guilds: int, regions: int) -> List[Dict]:
+    sink = {"messages": 0, "embeds": 0}
+    targets = plan(guilds, regions, sink)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        reset_bot_state(os.path.join(tmp, "bench.sqlite3"))
+        await bot.init_db()
+        bot.DISPATCHER.start()
+        scheduler = bot.PollScheduler()
+        scheduler._regions = targets
+        try:
+            for label in ("cold", "warm"):
+                if label == "warm":
+                    # Expire the shared results so the cycle really fetches again
+                    await bot.DB.execute("DELETE FROM region_results")
+                before, sent_before = counters(), dict(sink)
+                stub.requests.clear()
+                t0 = time.perf_counter()
+                await run_cycle(scheduler, targets)
+                elapsed = time.perf_counter() - t0
+                after = counters()
+                row = {k: after[k] - before[k] for k in after}
+                row.update(
+                    config=f"{guilds} guilds / {len(targets)} regions",
+                    cycle=label,
+                    seconds=elapsed,
+                    messages=sink["messages"] - sent_before["messages"],
+                    deals=sum(len(s["epic"]) + len(s["steam"]) for s in bot.REGION_SNAPSHOTS.values()),
+                )
+                rows.append(row)
+        finally:
+            await bot.DISPATCHER.stop()
+            await bot.DB.close()
+    return rows
+
+
+def print_table(rows: List[Dict]):
+    cols = (
+        ("config", 26, "s"),
+        ("cycle", 5, "s"),
+        ("seconds", 8, ".2f"),
+        ("requests", 8, ".0f"),
+        ("http_429", 8, ".0f"),
+        ("http_errors", 11, ".0f"),
+        ("db_reads", 8, ".0f"),
+        ("db_transactions", 15, ".0f"),
+        ("deals", 6, "d"),
+        ("messages", 8, "d"),
+    )
+    print("  ".join(f"{name:>{w}}" for name, w, _ in cols))
+    for r in rows:
+        print("  ".join(f"{r[name]:>{w}{f}}" for name, w, f in cols))
+
+
+async def amain(args):
+    stub = StubStores(args.steam_results, args.latency_ms, args.rate_limit)
+    url = await stub.start()
+    bot.EPIC_API_BASE = bot.STEAM_STORE_BASE = url
+    # One stub host stands in for all the store hosts
+    bot.HTTP_HOST_RATE = args.host_rate
+    await bot.open_http_session()
+    rows: List[Dict] = []
+    try:
+        for guilds in args.guilds:
+            rows.extend(await run_config(stub, guilds, args.regions))
+    finally:
+        await bot.close_http_session()
+        await stub.stop()
+    print(
+        f"stub: {args.steam_results} Steam results/region, ~{args.latency_ms:g} ms latency, "
+        f"{args.rate_limit:.0%} 429s, host rate limit {args.host_rate or 'off'}"
+    )
+    print_table(rows)
+    print(f"peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument(
+        "--guilds",
+        type=lambda s: [int(x) for x in s.split(",")],
+        default=[1, 100, 5000],
+        help="comma-separated guild counts, one configuration each",
+    )
+    ap.add_argument("--regions", type=int, default=30, help=f"max {len(REGION_CODES)}")
+    ap.add_argument("--steam-results", type=int, default=500, help="Steam search total_count")
+    ap.add_argument("--latency-ms", type=float, default=20.0, help="mean stub latency")
+    ap.add_argument("--rate-limit", type=float, default=0.0, help="fraction of requests answered 429")
+    ap.add_argument(
+        "--host-rate", type=float, default=0, help="per-host requests/second (0 = unlimited)"
+    )
+    asyncio.run(amain(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
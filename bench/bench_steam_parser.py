@@ -0,0 +1,68 @@
+"""
+Micro-benchmark: Steam search `results_html` extraction.
+
+Compares the old appid-only regex against parse_steam_search_rows on the
+synthetic sample pages in bench/fixtures, and reports how many rows the row
+data alone settles (no appdetails call needed).
+
+Run from the repo root:  python bench/bench_steam_parser.py [--repeat N]
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bot import parse_steam_search_rows, steam_row_verdict  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, "bench", "fixtures", "steam_search_page_*.json")
+
+
+def legacy_appids(results_html: str):
+    return [int(m) for m in re.findall(r'data-ds-appid=\"(\d+)\"', results_html)]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--repeat", type=int, default=200, help="iterations per page")
+    args = ap.parse_args()
+
+    pages = []
+    for path in sorted(glob.glob(FIXTURES)):
+        with open(path, encoding="utf-8") as f:
+            pages.append(json.load(f)["results_html"])
+    if not pages:
+        raise SystemExit(f"No fixtures found at {FIXTURES}")
+
+    rows = [r for html in pages for r in parse_steam_search_rows(html)]
+    verdicts = [steam_row_verdict(r) for r in rows]
+    legacy = sum(len(legacy_appids(html)) for html in pages)
+    print(f"pages: {len(pages)}, rows: {len(rows)}, bytes: {sum(len(h) for h in pages):,}")
+    print(f"legacy regex appids: {legacy} (multi-appid bundle rows dropped)")
+    print(
+        f"row verdicts: {verdicts.count(True)} free, {verdicts.count(False)} rejected, "
+        f"{verdicts.count(None)} need appdetails"
+    )
+
+    def run_legacy():
+        for html in pages:
+            legacy_appids(html)
+
+    def run_rows():
+        for html in pages:
+            for r in parse_steam_search_rows(html):
+                steam_row_verdict(r)
+
+    for name, fn in (("legacy findall", run_legacy), ("row extractor", run_rows)):
+        best = min(timeit.repeat(fn, number=args.repeat, repeat=5)) / args.repeat
+        per_row = best / max(1, len(rows)) * 1e6
+        print(f"{name:>15}: {best * 1e3:8.3f} ms/cycle  ({per_row:6.2f} µs/row)")
+
+
+if __name__ == "__main__":
+    main()
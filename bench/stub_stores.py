@@ -0,0 +1,205 @@
+"""
+Local stand-in for the Epic and Steam endpoints the bot scrapes.
+
+Serves the synthetic fixtures in bench/fixtures (hand-made in the stores'
+response shapes; titles, IDs and prices are made up, so the benchmark
+numbers are not a replay of real Steam/Epic traffic):
+  - Epic freeGamesPromotions, with promo dates shifted so the fixture's
+    windows are live "now", plus ETag / If-None-Match support
+  - Steam search pages of any size, built from the fixture search rows
+    with fresh appids per 100-row block
+  - Steam appdetails (price_overview batches and basic) and featuredcategories
+
+Latency and 429s (with Retry-After) are injected per request. Use
+StubStores from a benchmark, or run it directly and point EPIC_API_BASE /
+STEAM_STORE_BASE at it:  python bench/stub_stores.py --port 8765
+"""
+import argparse
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import random
+import re
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+_ISO_RE = re.compile(r'"(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d+)?Z)"')
+_ROW_SPLIT_RE = re.compile(r"(?=<a href)")
+_ROW_APPIDS_RE = re.compile(r'data-ds-appid="([\d,]+)"')
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def load_epic_feed(now: float) -> bytes:
+    """The synthetic Epic feed with every date moved by (now - generatedAt)."""
+    with open(os.path.join(FIXTURES, "epic_free_games.json"), encoding="utf-8") as f:
+        feed = json.load(f)
+    generated = datetime.fromisoformat(feed.pop("generatedAt").replace("Z", "+00:00")).timestamp()
+    shift = now - generated
+    raw = json.dumps(feed)
+
+    def move(m: re.Match) -> str:
+        ts = datetime.fromisoformat(m.group(1).replace("Z", "+00:00")).timestamp()
+        return f'"{_iso(ts + shift)}"'
+
+    return _ISO_RE.sub(move, raw).encode()
+
+
+def load_steam_rows() -> List[str]:
+    rows: List[str] = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "steam_search_page_*.json"))):
+        with open(path, encoding="utf-8") as f:
+            html = json.load(f)["results_html"]
+        rows.extend(r for r in _ROW_SPLIT_RE.split(html) if r.strip())
+    if not rows:
+        raise SystemExit(f"No Steam search fixtures in {FIXTURES}")
+    return rows
+
+
+class StubStores:
+    def __init__(
+        self,
+        steam_results: int = 500,
+        latency_ms: float = 20.0,
+        rate_limit: float = 0.0,
+        retry_after: float = 1.0,
+        seed: int = 1,
+    ):
+        self.steam_results = steam_results
+        self.latency = latency_ms / 1000
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.requests: Counter = Counter()
+        self.throttled: Counter = Counter()
+        self.epic_body = load_epic_feed(datetime.now(timezone.utc).timestamp())
+        self.epic_etag = '"' + hashlib.md5(self.epic_body).hexdigest() + '"'
+        self._templates = load_steam_rows()
+        self._rows: Dict[int, str] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self.url = ""
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._conditions])
+        app.router.add_get("/freeGamesPromotions", self.epic)
+        app.router.add_get("/search/results/", self.steam_search)
+        app.router.add_get("/api/appdetails", self.steam_appdetails)
+        app.router.add_get("/api/featuredcategories", self.steam_featured)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @web.middleware
+    async def _conditions(self, request: web.Request, handler):
+        """Per-request latency (±50% jitter) and random 429s."""
+        self.requests[request.path] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency * self.rng.uniform(0.5, 1.5))
+        if self.rate_limit and self.rng.random() < self.rate_limit:
+            self.throttled[request.path] += 1
+            return web.Response(status=429, headers={"Retry-After": f"{self.retry_after:g}"})
+        return await handler(request)
+
+    async def epic(self, request: web.Request) -> web.Response:
+        if request.headers.get("If-None-Match") == self.epic_etag:
+            return web.Response(status=304, headers={"ETag": self.epic_etag})
+        return web.Response(
+            body=self.epic_body, content_type="application/json", headers={"ETag": self.epic_etag}
+        )
+
+    def _row(self, k: int) -> str:
+        """Search row k: fixture row k % len(templates) with appids moved to a fresh block."""
+        row = self._rows.get(k)
+        if row is None:
+            n = len(self._templates)
+            row = self._templates[k % n]
+            block = (k // n) * 1_000_000
+            if block:
+                m = _ROW_APPIDS_RE.search(row)
+                for appid in m.group(1).split(",") if m else ():
+                    row = re.sub(rf"\b{appid}\b", str(int(appid) + block), row)
+            self._rows[k] = row
+        return row
+
+    async def steam_search(self, request: web.Request) -> web.Response:
+        start = int(request.query.get("start", "0"))
+        count = int(request.query.get("count", "50"))
+        end = min(self.steam_results, start + count)
+        html = "".join(self._row(k) for k in range(start, end))
+        return web.json_response(
+            {"success": 1, "results_html": html, "total_count": self.steam_results, "start": start}
+        )
+
+    @staticmethod
+    def _price(appid: int) -> Dict:
+        # Deterministic mix: a third are paid -> free, the rest ordinary discounts
+        if appid % 3 == 0:
+            return {"currency": "USD", "initial": 1999, "final": 0, "discount_percent": 100,
+                    "initial_formatted": "$19.99", "final_formatted": "Free"}
+        return {"currency": "USD", "initial": 2999, "final": 1499, "discount_percent": 50,
+                "initial_formatted": "$29.99", "final_formatted": "$14.99"}
+
+    async def steam_appdetails(self, request: web.Request) -> web.Response:
+        ids = [int(a) for a in request.query.get("appids", "").split(",") if a]
+        filters = request.query.get("filters", "")
+        out = {}
+        for appid in ids:
+            if filters == "price_overview":
+                out[str(appid)] = {"success": True, "data": {"price_overview": self._price(appid)}}
+            else:
+                out[str(appid)] = {
+                    "success": True,
+                    "data": {
+                        "type": "dlc" if appid % 10 == 0 else "game",
+                        "name": f"Stub Game {appid}",
+                        "steam_appid": appid,
+                    },
+                }
+        return web.json_response(out)
+
+    async def steam_featured(self, request: web.Request) -> web.Response:
+        return web.json_response({"specials": {"items": []}})
+
+
+async def _serve(args):
+    stub = StubStores(args.steam_results, args.latency_ms, args.rate_limit)
+    url = await stub.start(port=args.port)
+    print(f"EPIC_API_BASE={url} STEAM_STORE_BASE={url}")
+    await asyncio.Event().wait()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--steam-results", type=int, default=500, help="Steam search total_count")
+    ap.add_argument("--latency-ms", type=float, default=20.0, help="mean added latency")
+    ap.add_argument("--rate-limit", type=float, default=0.0, help="fraction of requests answered 429")
+    try:
+        asyncio.run(_serve(ap.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,40 @@
 import os
 import asyncio
+import bisect
+import functools
+import socket
+import sys
+import contextlib
+import heapq
+import hashlib
+import html
+import itertools
+import json
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from email.utils import parsedate_to_datetime
+from typing import (
+    AbstractSet,
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+from urllib.parse import urlsplit
 import re
 
 import aiohttp
+from aiohttp import web
 import aiosqlite
 import discord
 from discord import app_commands
@@ -19,17 +49,429 @@ load_dotenv()
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 POLL_MINUTES = int(os.getenv("POLL_MINUTES", "30"))
 DB_PATH = os.getenv("DB_PATH", "free_deals.sqlite3")
+# How many regions the poller fetches at the same time
+REGION_FETCH_CONCURRENCY = int(os.getenv("REGION_FETCH_CONCURRENCY", "4"))
+# /freelist serves the region snapshot and refreshes it in the background past this age
+SNAPSHOT_MAX_AGE = int(os.getenv("SNAPSHOT_MAX_AGE_MINUTES", "10")) * 60
+# A region with no snapshot yet: /freelist waits this long for its stores, then
+# shows the ones that answered and marks the rest as still loading
+FREELIST_COLD_WAIT = float(os.getenv("FREELIST_COLD_WAIT_SECONDS", "10"))
+# Adaptive polling: POLL_MINUTES is the base interval per source and region;
+# stable feeds back off towards POLL_MAX_MINUTES, busy ones poll down to POLL_MIN_MINUTES
+POLL_MIN_MINUTES = float(os.getenv("POLL_MIN_MINUTES", "5"))
+POLL_MAX_MINUTES = float(os.getenv("POLL_MAX_MINUTES", str(POLL_MINUTES * 4)))
+# +/- fraction of the interval added to each job's next run
+POLL_JITTER = float(os.getenv("POLL_JITTER", "0.1"))
+# Ledger rows for deals that expired this long ago are pruned
+ANNOUNCE_LEDGER_GRACE = int(os.getenv("ANNOUNCE_LEDGER_GRACE_DAYS", "7")) * 86400
+# Expired-deal sweep: how often it runs, rows per batch, and how long ended
+# deals are kept before they are archived (ARCHIVE_ENDED_DEALS) or deleted
+DEAL_SWEEP_MINUTES = float(os.getenv("DEAL_SWEEP_MINUTES", "30"))
+DEAL_SWEEP_BATCH = int(os.getenv("DEAL_SWEEP_BATCH", "500"))
+DEAL_RETENTION = int(os.getenv("DEAL_RETENTION_DAYS", "30")) * 86400
+ARCHIVE_ENDED_DEALS = os.getenv("ARCHIVE_ENDED_DEALS", "false").lower() == "true"
+# Announcement delivery: worker count and retries per message
+ANNOUNCE_WORKERS = int(os.getenv("ANNOUNCE_WORKERS", "4"))
+ANNOUNCE_MAX_RETRIES = int(os.getenv("ANNOUNCE_MAX_RETRIES", "5"))
+# Delivered announcements are written to the ledger in batches this often
+ANNOUNCE_LEDGER_FLUSH_SECONDS = float(os.getenv("ANNOUNCE_LEDGER_FLUSH_SECONDS", "2"))
+# Shared HTTP connection pool (one session for the whole process)
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+HTTP_PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", "20"))
+HTTP_KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "60"))
+HTTP_DNS_CACHE_TTL = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+# Per-attempt request timeout; failed attempts are retried with backoff
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "15"))
+# Responses larger than this (decompressed) are abandoned mid-stream
+HTTP_MAX_BODY_BYTES = int(os.getenv("HTTP_MAX_BODY_MB", "8")) * 1024 * 1024
+HTTP_RETRIES = max(0, int(os.getenv("HTTP_RETRIES", "3")))
+HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.5"))
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "30"))
+# Token bucket per host: sustained requests/second and burst size.
+# HTTP_HOST_RATES overrides the rate per host, e.g. "store.steampowered.com=4,example.com=1"
+HTTP_HOST_RATE = float(os.getenv("HTTP_HOST_RATE", "10"))
+HTTP_HOST_BURST = int(os.getenv("HTTP_HOST_BURST", "20"))
+HTTP_HOST_RATES = {
+    host.strip(): float(rate)
+    for host, _, rate in (
+        p.partition("=") for p in os.getenv("HTTP_HOST_RATES", "").split(",") if "=" in p
+    )
+}
+# Circuit breaker: this many consecutive failures pause a host for the cooldown
+HTTP_BREAKER_FAILURES = int(os.getenv("HTTP_BREAKER_FAILURES", "5"))
+HTTP_BREAKER_COOLDOWN = float(os.getenv("HTTP_BREAKER_COOLDOWN", "60"))
+# Steam appdetails cache: static fields (type, name) vs. volatile price data
+STEAM_CACHE_STATIC_TTL = int(os.getenv("STEAM_CACHE_STATIC_TTL_HOURS", "168")) * 3600
+STEAM_CACHE_PRICE_TTL = int(os.getenv("STEAM_CACHE_PRICE_TTL_MINUTES", "15")) * 60
+STEAM_CACHE_MAX_ENTRIES = int(os.getenv("STEAM_CACHE_MAX_ENTRIES", "50000"))
+# Steam search pages fetched in parallel after page 0
+STEAM_SEARCH_CONCURRENCY = int(os.getenv("STEAM_SEARCH_CONCURRENCY", "4"))
+# appids packed into one appdetails?filters=price_overview request
+STEAM_APPDETAILS_BATCH = int(os.getenv("STEAM_APPDETAILS_BATCH", "50"))
+# Per-store fetch timeout for one region: SOURCE_TIMEOUT_SECONDS unless the
+# store sets its own; SOURCE_TIMEOUTS overrides per store, e.g. "steam=600,epic=30"
+SOURCE_TIMEOUT_SECONDS = float(os.getenv("SOURCE_TIMEOUT_SECONDS", "120"))
+SOURCE_TIMEOUTS = {
+    name.strip(): float(seconds)
+    for name, _, seconds in (
+        p.partition("=") for p in os.getenv("SOURCE_TIMEOUTS", "").split(",") if "=" in p
+    )
+}
+# Store API roots; overridable so benchmarks can point the bot at a local stub
+EPIC_API_BASE = os.getenv("EPIC_API_BASE", "https://store-site-backend-static.ak.epicgames.com")
+STEAM_STORE_BASE = os.getenv("STEAM_STORE_BASE", "https://store.steampowered.com")
+
+# Sharding: SHARD_COUNT + SHARD_IDS (e.g. "0-3" or "0,2") pick this process's
+# shards; AUTO_SHARD=1 lets discord.py choose. Unset = single connection.
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "0")) or None
+SHARD_IDS = os.getenv("SHARD_IDS", "").strip()
+AUTO_SHARD = os.getenv("AUTO_SHARD", "0") == "1"
+# Identifies this process in the shared fetch lease table
+INSTANCE_ID = os.getenv("INSTANCE_ID") or f"{socket.gethostname()}-{os.getpid()}"
+# Fetch lease length; the holder renews it every third of this while its fetch runs
+FETCH_LEASE_SECONDS = int(os.getenv("FETCH_LEASE_SECONDS", "300"))
+# Sync slash commands on every start, even when the command tree is unchanged
+FORCE_COMMAND_SYNC = os.getenv("FORCE_COMMAND_SYNC", "0") == "1"
+# Prometheus-style /metrics endpoint; METRICS_PORT=0 turns it off
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+
+
+def parse_shard_ids(spec: str) -> Optional[List[int]]:
+    if not spec:
+        return None
+    ids: List[int] = []
+    for part in spec.split(","):
+        part = part.strip()
+        if "-" in part:
+            lo, hi = part.split("-", 1)
+            ids.extend(range(int(lo), int(hi) + 1))
+        elif part:
+            ids.append(int(part))
+    return sorted(set(ids))
+
+
+def make_bot(intents: discord.Intents) -> commands.Bot:
+    shard_ids = parse_shard_ids(SHARD_IDS)
+    if shard_ids is not None and SHARD_COUNT is None:
+        raise SystemExit("SHARD_IDS requires SHARD_COUNT.")
+    if shard_ids is None and SHARD_COUNT is None and not AUTO_SHARD:
+        return commands.Bot(command_prefix="!", intents=intents)
+    return commands.AutoShardedBot(
+        command_prefix="!", intents=intents, shard_count=SHARD_COUNT, shard_ids=shard_ids
+    )
+
 
 # Discord setup
 INTENTS = discord.Intents.default()
-BOT = commands.Bot(command_prefix="!", intents=INTENTS)
+BOT = make_bot(INTENTS)
 TREE = BOT.tree
 
+# ----------------- Metrics -----------------
+
+# Latency buckets (seconds): sub-ms DB reads up to multi-second store scrapes
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Metrics:
+    """
+    In-process counters, gauges and latency histograms, rendered in the
+    Prometheus text format by the /metrics endpoint. Series are keyed by
+    metric name plus a sorted tuple of label pairs.
+    """
+
+    def __init__(self):
+        self.help: Dict[str, Tuple[str, str]] = {}
+        self.counters: Dict[str, Dict[Tuple, float]] = {}
+        self.gauges: Dict[str, Dict[Tuple, float]] = {}
+        # name -> labels -> [bucket counts..., +Inf count, sum]
+        self.histograms: Dict[str, Dict[Tuple, List[float]]] = {}
+        # Callbacks run at scrape time for values owned by other components
+        self.collectors: List[Callable[[], None]] = []
+
+    def describe(self, name: str, kind: str, text: str):
+        self.help[name] = (kind, text)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        series = self.counters.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        self.gauges.setdefault(name, {})[tuple(sorted(labels.items()))] = value
+
+    def observe(self, name: str, seconds: float, **labels):
+        series = self.histograms.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        h = series.get(key)
+        if h is None:
+            h = series[key] = [0.0] * (len(LATENCY_BUCKETS) + 2)
+        h[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        h[-1] += seconds
+
+    @contextlib.contextmanager
+    def timer(self, name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, name: str, **labels):
+        """Decorator: observe an async function's latency in histogram `name`."""
+
+        def wrap(fn):
+            @functools.wraps(fn)
+            async def inner(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return await fn(*args, **kwargs)
+
+            return inner
+
+        return wrap
+
+    def render(self) -> str:
+        for collect in self.collectors:
+            try:
+                collect()
+            except Exception as e:
+                print(f"[metrics] collector error: {e}")
+
+        def fmt(labels: Tuple, extra: Tuple = ()) -> str:
+            pairs = labels + extra
+            if not pairs:
+                return ""
+            esc = (str(v).replace("\\", "\\\\").replace('"', '\\"') for _, v in pairs)
+            return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, esc)) + "}"
+
+        lines: List[str] = []
+
+        def header(name: str, kind: str):
+            lines.append(f"# HELP {name} {self.help.get(name, (kind, name))[1]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for kind, table in (("counter", self.counters), ("gauge", self.gauges)):
+            for name, series in sorted(table.items()):
+                header(name, kind)
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{fmt(labels)} {prom_value(value)}")
+        for name, series in sorted(self.histograms.items()):
+            header(name, "histogram")
+            for labels, h in sorted(series.items()):
+                total = 0.0
+                for bound, n in zip(LATENCY_BUCKETS + ("+Inf",), h[:-1]):
+                    total += n
+                    lines.append(f"{name}_bucket{fmt(labels, (('le', bound),))} {prom_value(total)}")
+                lines.append(f"{name}_sum{fmt(labels)} {h[-1]:.6f}")
+                lines.append(f"{name}_count{fmt(labels)} {prom_value(total)}")
+        return "\n".join(lines) + "\n"
+
+
+def prom_value(v: float) -> str:
+    """Exposition-format number at full precision (`:g` keeps only 6 digits)."""
+    if v != v:
+        return "NaN"
+    if v in (float("inf"), float("-inf")):
+        return "+Inf" if v > 0 else "-Inf"
+    if float(v).is_integer():
+        return str(int(v))
+    return repr(float(v))
+
+
+METRICS = Metrics()
+for _name, _kind, _text in (
+    ("http_requests_total", "counter", "Outgoing HTTP requests by host and status"),
+    ("http_request_seconds", "histogram", "Outgoing HTTP request latency by host"),
+    ("http_retries_total", "counter", "Retried HTTP requests by host and reason"),
+    ("http_circuit_open_total", "counter", "Times a host's circuit breaker opened"),
+    ("http_conditional_total", "counter", "Conditional feed fetches by outcome"),
+    ("fetch_seconds", "histogram", "Store fetcher latency by source"),
+    ("fetch_errors_total", "counter", "Store fetcher failures by source"),
+    ("deals_found", "gauge", "Deals returned by the last fetch per source and region"),
+    ("steam_appdetails_cache_total", "counter", "Steam appdetails cache lookups by result"),
+    ("steam_incomplete_total", "counter", "Steam search pages / apps left unchecked after retries"),
+    ("snapshot_requests_total", "counter", "/freelist snapshot lookups by result"),
+    ("freelist_render_total", "counter", "/freelist render cache lookups by result"),
+    ("source_rejected_deals_total", "counter", "Fetched deals dropped by validation, by reason"),
+    ("deals_swept_total", "counter", "Stored deals ended / archived / deleted by the expiry sweep"),
+    ("shared_results_total", "counter", "Shared fetch results by outcome"),
+    ("db_seconds", "histogram", "SQLite call latency by operation"),
+    ("announce_seconds", "histogram", "Ledger diff and queueing time per region"),
+    ("announcements_total", "counter", "Announcement messages by delivery result"),
+    ("announce_backlog", "gauge", "Announcement messages waiting for delivery"),
+    ("poll_job_seconds", "histogram", "Scheduler job duration (fetch, store, announce) by source"),
+    ("poll_jobs_total", "counter", "Scheduler jobs by source and result"),
+):
+    METRICS.describe(_name, _kind, _text)
+
+
+async def _metrics_handler(request: web.Request) -> web.Response:
+    return web.Response(text=METRICS.render(), content_type="text/plain", charset="utf-8")
+
+
+async def start_metrics_server() -> Optional[web.AppRunner]:
+    """Serve GET /metrics on the bot's own event loop (no extra thread)."""
+    if not METRICS_PORT:
+        return None
+    app = web.Application()
+    app.router.add_get("/metrics", _metrics_handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, METRICS_HOST, METRICS_PORT).start()
+    except OSError as e:
+        print(f"[metrics] cannot listen on {METRICS_HOST}:{METRICS_PORT}: {e}")
+        await runner.cleanup()
+        return None
+    print(f"[metrics] serving http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+    return runner
+
+
+# ----------------- Deals -----------------
+
+
+@dataclass(frozen=True, slots=True)
+class Deal:
+    """
+    One paid -> free deal as seen in one region; the same record flows from
+    the fetchers through storage, the diff and the ledger to the embeds.
+    Timestamps are epoch seconds (None = unknown). Hashable, so it can be
+    diffed and fingerprinted directly.
+    """
+
+    platform: str
+    region: str
+    app_id: str
+    title: str
+    url: str
+    starts_at: Optional[int] = None
+    ends_at: Optional[int] = None
+
+    def __post_init__(self):
+        # A handful of distinct values shared by every deal: keep one copy each
+        object.__setattr__(self, "platform", sys.intern(self.platform))
+        object.__setattr__(self, "region", sys.intern(self.region))
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return self.platform, self.app_id
+
+    def to_row(self) -> Tuple:
+        """Column order of the deals table and of shared results."""
+        return (
+            self.platform,
+            self.app_id,
+            self.region,
+            self.title,
+            self.url,
+            self.starts_at,
+            self.ends_at,
+        )
+
+    @classmethod
+    def from_row(cls, row) -> "Deal":
+        platform, app_id, region, title, url, starts_at, ends_at = row
+        return cls(platform, region, app_id, title, url, starts_at, ends_at)
+
+
+def deal_live(d: Deal, now: int) -> bool:
+    return d.ends_at is None or d.ends_at > now
+
+
+class PartialDeals(list):
+    """
+    A fetch result with holes (search pages or lookups that failed): the
+    deals in it are real, but a deal missing from it may still be live, so
+    nothing is marked ended from it.
+    """
+
+
 # ----------------- DB -----------------
 
+
+class Database:
+    """
+    One long-lived aiosqlite connection shared by every DB helper.
+    WAL + synchronous=NORMAL keeps commits cheap; writes are serialized by a
+    lock so a multi-statement transaction never interleaves with another write.
+    SQL strings are constants, so sqlite3's statement cache reuses the
+    prepared statements across calls.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[aiosqlite.Connection] = None
+        self._connect_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+
+    async def connect(self) -> aiosqlite.Connection:
+        if self._conn is None:
+            async with self._connect_lock:
+                if self._conn is None:
+                    # isolation_level=None: autocommit unless we BEGIN explicitly
+                    conn = await aiosqlite.connect(
+                        self.path, isolation_level=None, cached_statements=256
+                    )
+                    await conn.execute("PRAGMA journal_mode=WAL")
+                    await conn.execute("PRAGMA synchronous=NORMAL")
+                    await conn.execute("PRAGMA busy_timeout=5000")
+                    self._conn = conn
+        return self._conn
+
+    async def close(self):
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+    async def fetchone(self, sql: str, params=()):
+        conn = await self.connect()
+        with METRICS.timer("db_seconds", op="read"):
+            async with conn.execute(sql, params) as cur:
+                return await cur.fetchone()
+
+    async def fetchall(self, sql: str, params=()):
+        conn = await self.connect()
+        with METRICS.timer("db_seconds", op="read"):
+            async with conn.execute(sql, params) as cur:
+                return await cur.fetchall()
+
+    async def execute(self, sql: str, params=()):
+        """Single write statement in its own transaction."""
+        async with self.transaction() as conn:
+            await conn.execute(sql, params)
+
+    @contextlib.asynccontextmanager
+    async def transaction(self):
+        conn = await self.connect()
+        start = time.perf_counter()
+        async with self._write_lock:
+            METRICS.observe("db_seconds", time.perf_counter() - start, op="write_lock_wait")
+            with METRICS.timer("db_seconds", op="transaction"):
+                # IMMEDIATE: take SQLite's write lock up front. A deferred BEGIN
+                # that reads first can't wait for another process's writer
+                # (busy_timeout doesn't apply to the upgrade) and fails at once.
+                await conn.execute("BEGIN IMMEDIATE")
+                try:
+                    yield conn
+                except BaseException:
+                    await conn.rollback()
+                    raise
+                await conn.commit()
+
+
+DB = Database(DB_PATH)
+
+
 async def init_db():
-    async with aiosqlite.connect(DB_PATH) as db:
-        # region-aware deals table (avoid cross-region collisions)
+    async with DB.transaction() as db:
+        async with db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='announcements'"
+        ) as cur:
+            has_ledger = await cur.fetchone() is not None
+        async with db.execute("PRAGMA table_info(deals)") as cur:
+            deal_columns = {r[1] for r in await cur.fetchall()}
+        # region-aware deals table (avoid cross-region collisions);
+        # start/end are epoch seconds
         await db.execute(
             """
         CREATE TABLE IF NOT EXISTS deals (
@@ -38,11 +480,74 @@ async def init_db():
             region TEXT NOT NULL,
             title TEXT NOT NULL,
             url TEXT NOT NULL,
-            started_at TEXT,
-            ends_at TEXT,
+            starts_at INTEGER,
+            ends_at INTEGER,
+            last_seen INTEGER,
+            ended_at INTEGER,
             PRIMARY KEY (platform, app_id, region)
         )"""
         )
+        if "started_at" in deal_columns:
+            # Older databases kept ISO-8601 text; convert once
+            await db.execute("ALTER TABLE deals RENAME TO deals_iso")
+            await db.execute(
+                """
+            CREATE TABLE deals (
+                platform TEXT NOT NULL,
+                app_id TEXT NOT NULL,
+                region TEXT NOT NULL,
+                title TEXT NOT NULL,
+                url TEXT NOT NULL,
+                starts_at INTEGER,
+                ends_at INTEGER,
+                last_seen INTEGER,
+                ended_at INTEGER,
+                PRIMARY KEY (platform, app_id, region)
+            )"""
+            )
+            await db.execute(
+                """
+            INSERT INTO deals (platform, app_id, region, title, url, starts_at, ends_at)
+            SELECT platform, app_id, region, title, url,
+                   CAST(strftime('%s', started_at) AS INTEGER),
+                   CAST(strftime('%s', ends_at) AS INTEGER)
+            FROM deals_iso
+            """
+            )
+            await db.execute("DROP TABLE deals_iso")
+        elif deal_columns and "ended_at" not in deal_columns:
+            await db.execute("ALTER TABLE deals ADD COLUMN last_seen INTEGER")
+            await db.execute("ALTER TABLE deals ADD COLUMN ended_at INTEGER")
+        # Active deals per region: covers apply_region_deals' load of the stored
+        # active rows it diffs each fetch against
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_deals_region_active "
+            "ON deals(region, platform, title, app_id, url, starts_at, ends_at, ended_at) "
+            "WHERE ended_at IS NULL"
+        )
+        # For the sweep: active deals past their end time, and long-ended rows
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_deals_expiry "
+            "ON deals(ends_at) WHERE ended_at IS NULL AND ends_at IS NOT NULL"
+        )
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_deals_ended ON deals(ended_at) WHERE ended_at IS NOT NULL"
+        )
+        # Ended deals past DEAL_RETENTION, when ARCHIVE_ENDED_DEALS is on
+        await db.execute(
+            """
+        CREATE TABLE IF NOT EXISTS deals_archive (
+            platform TEXT NOT NULL,
+            app_id TEXT NOT NULL,
+            region TEXT NOT NULL,
+            title TEXT NOT NULL,
+            url TEXT NOT NULL,
+            starts_at INTEGER,
+            ends_at INTEGER,
+            last_seen INTEGER,
+            ended_at INTEGER NOT NULL
+        )"""
+        )
         await db.execute(
             """
         CREATE TABLE IF NOT EXISTS guild_settings (
@@ -51,78 +556,520 @@ async def init_db():
             channel_id INTEGER
         )"""
         )
-        await db.commit()
-
-
-async def upsert_deal(
-    platform: str,
-    app_id: str,
-    region: str,
-    title: str,
-    url: str,
-    started_at: Optional[str],
-    ends_at: Optional[str],
-):
-    async with aiosqlite.connect(DB_PATH) as db:
+        # Steam appdetails cache, keyed by (appid, cc)
         await db.execute(
             """
-        INSERT INTO deals (platform, app_id, region, title, url, started_at, ends_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
+        CREATE TABLE IF NOT EXISTS steam_app_cache (
+            appid INTEGER NOT NULL,
+            cc TEXT NOT NULL,
+            success INTEGER NOT NULL,
+            app_type TEXT,
+            name TEXT,
+            static_fetched_at INTEGER,
+            price_json TEXT,
+            price_fetched_at INTEGER,
+            last_used_at INTEGER NOT NULL,
+            PRIMARY KEY (appid, cc)
+        )"""
+        )
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_steam_app_cache_lru "
+            "ON steam_app_cache(last_used_at)"
+        )
+        # Which guild has been told about which deal. Region leads the key so a
+        # region's whole ledger is one range scan when fanning out a fetch.
+        await db.execute(
+            """
+        CREATE TABLE IF NOT EXISTS announcements (
+            region TEXT NOT NULL,
+            platform TEXT NOT NULL,
+            app_id TEXT NOT NULL,
+            guild_id INTEGER NOT NULL,
+            expires_at INTEGER,
+            PRIMARY KEY (region, platform, app_id, guild_id)
+        ) WITHOUT ROWID"""
+        )
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_announcements_expiry "
+            "ON announcements(expires_at) WHERE expires_at IS NOT NULL"
+        )
+        # Epic promo windows (active and upcoming) as epoch seconds, so promo
+        # starts/ends can be acted on at the exact time without re-fetching
+        await db.execute(
+            """
+        CREATE TABLE IF NOT EXISTS epic_promo_windows (
+            region TEXT NOT NULL,
+            app_id TEXT NOT NULL,
+            starts_at INTEGER NOT NULL,
+            ends_at INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            url TEXT NOT NULL,
+            PRIMARY KEY (region, app_id, starts_at)
+        )"""
+        )
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_epic_windows_start ON epic_promo_windows(starts_at)"
+        )
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_epic_windows_end ON epic_promo_windows(ends_at)"
+        )
+        # Latest fetch result per (region, source), shared between shard processes
+        await db.execute(
+            """
+        CREATE TABLE IF NOT EXISTS region_results (
+            region TEXT NOT NULL,
+            source TEXT NOT NULL,
+            deals_json TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            fetched_by TEXT,
+            complete INTEGER NOT NULL DEFAULT 1,
+            PRIMARY KEY (region, source)
+        )"""
+        )
+        async with db.execute("PRAGMA table_info(region_results)") as cur:
+            if "complete" not in {r[1] for r in await cur.fetchall()}:
+                await db.execute(
+                    "ALTER TABLE region_results ADD COLUMN complete INTEGER NOT NULL DEFAULT 1"
+                )
+        # Who is fetching a (region, source) right now, so shards don't all scrape it
+        await db.execute(
+            """
+        CREATE TABLE IF NOT EXISTS fetch_leases (
+            region TEXT NOT NULL,
+            source TEXT NOT NULL,
+            holder TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (region, source)
+        )"""
+        )
+        # Conditional-GET validators and the parsed feed they vouch for, so a
+        # restart can revalidate instead of re-downloading and re-parsing
+        await db.execute(
+            """
+        CREATE TABLE IF NOT EXISTS http_validators (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            hash TEXT NOT NULL,
+            value_json TEXT NOT NULL,
+            updated_at INTEGER NOT NULL
+        )"""
+        )
+        # Small key/value store for process state (e.g. the last synced command tree)
+        await db.execute(
+            """
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )"""
+        )
+        if not has_ledger:
+            # First run with a ledger: everything already stored was announced
+            # by the old per-region logic, don't announce it a second time.
+            await db.execute(
+                """
+            INSERT OR IGNORE INTO announcements (region, platform, app_id, guild_id)
+            SELECT d.region, d.platform, d.app_id, g.guild_id
+            FROM deals d JOIN guild_settings g ON d.region = COALESCE(g.region, 'US')
+            WHERE g.channel_id IS NOT NULL
+            """
+            )
+
+
+UPSERT_DEAL_SQL = """
+        INSERT INTO deals (platform, app_id, region, title, url, starts_at, ends_at, last_seen)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         ON CONFLICT(platform, app_id, region) DO UPDATE SET
           title=excluded.title,
           url=excluded.url,
-          started_at=COALESCE(excluded.started_at, deals.started_at),
-          ends_at=excluded.ends_at
-        """,
-            (platform, app_id, region, title, url, started_at, ends_at),
+          starts_at=COALESCE(excluded.starts_at, deals.starts_at),
+          ends_at=excluded.ends_at,
+          last_seen=excluded.last_seen,
+          ended_at=NULL
+        """
+
+
+@dataclass
+class DealChanges:
+    """What a region fetch changed, per platform."""
+
+    added: Dict[str, List[Deal]] = field(default_factory=dict)
+    updated: Dict[str, List[Deal]] = field(default_factory=dict)
+    # active app_ids stored for the region that the fetch no longer returned
+    # (never filled from a PartialDeals result)
+    ended: Dict[str, List[str]] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return any(self.added.values()) or any(self.updated.values()) or any(self.ended.values())
+
+
+def diff_region_deals(
+    results: Dict[str, List[Deal]], known: Dict[Tuple[str, str], Deal]
+) -> DealChanges:
+    """
+    Set-based diff of fetched deals ({platform: [deal, ...]}) against the
+    stored active ones ({(platform, app_id): deal}).
+    """
+    changes = DealChanges()
+    for platform, deals in results.items():
+        fetched = {d.app_id: d for d in deals}
+        stored = {app_id for (p, app_id) in known if p == platform}
+        changes.added[platform] = [fetched[k] for k in fetched.keys() - stored]
+        changes.updated[platform] = []
+        for k in fetched.keys() & stored:
+            d = fetched[k]
+            old = known[(platform, k)]
+            # starts_at is only ever filled in, never cleared (see UPSERT_DEAL_SQL)
+            if (d.title, d.url, d.starts_at or old.starts_at, d.ends_at) != (
+                old.title,
+                old.url,
+                old.starts_at,
+                old.ends_at,
+            ):
+                changes.updated[platform].append(d)
+        if isinstance(deals, PartialDeals):
+            changes.ended[platform] = []
+        else:
+            changes.ended[platform] = sorted(stored - fetched.keys())
+    return changes
+
+
+async def apply_region_deals(region: str, results: Dict[str, List[Deal]]) -> DealChanges:
+    """
+    Diff a region's fetch results against its active stored deals with one
+    query, in one transaction: upsert added/updated rows, bump last_seen on
+    the unchanged ones and mark deals the fetch no longer returned as ended.
+    An ended deal that comes back is "added" again and reactivated.
+    """
+    now = int(time.time())
+    async with DB.transaction() as db:
+        async with db.execute(
+            "SELECT platform, app_id, region, title, url, starts_at, ends_at "
+            "FROM deals WHERE region=? AND ended_at IS NULL",
+            (region,),
+        ) as cur:
+            known = {(r[0], r[1]): Deal.from_row(r) for r in await cur.fetchall()}
+        changes = diff_region_deals(results, known)
+        written = [
+            d for bucket in (changes.added, changes.updated) for ds in bucket.values() for d in ds
+        ]
+        if written:
+            await db.executemany(UPSERT_DEAL_SQL, [(*d.to_row(), now) for d in written])
+        keys = {d.key for d in written}
+        seen = [
+            (now, d.platform, d.app_id, region)
+            for ds in results.values()
+            for d in ds
+            if d.key not in keys
+        ]
+        if seen:
+            await db.executemany(
+                "UPDATE deals SET last_seen=? WHERE platform=? AND app_id=? AND region=?", seen
+            )
+        ended = [(now, p, app_id, region) for p, ids in changes.ended.items() for app_id in ids]
+        if ended:
+            await db.executemany(
+                "UPDATE deals SET ended_at=? WHERE platform=? AND app_id=? AND region=?", ended
+            )
+    return changes
+
+
+async def get_announced(region: str) -> Dict[int, Set[Tuple[str, str]]]:
+    """Announcement ledger for a region: {guild_id: {(platform, app_id), ...}}."""
+    rows = await DB.fetchall(
+        "SELECT guild_id, platform, app_id FROM announcements WHERE region=?",
+        (region,),
+    )
+    out: Dict[int, Set[Tuple[str, str]]] = {}
+    for guild_id, platform, app_id in rows:
+        out.setdefault(guild_id, set()).add((platform, app_id))
+    return out
+
+
+async def record_announcements(entries: List[Tuple[str, int, Deal]]):
+    """Mark (region, guild_id, deal) entries as announced, in one transaction."""
+    if not entries:
+        return
+    async with DB.transaction() as db:
+        await db.executemany(
+            "INSERT OR IGNORE INTO announcements "
+            "(region, platform, app_id, guild_id, expires_at) VALUES (?, ?, ?, ?, ?)",
+            [(region, d.platform, d.app_id, gid, d.ends_at) for region, gid, d in entries],
         )
-        await db.commit()
 
 
-async def get_all_deals_for_region(region: str):
-    async with aiosqlite.connect(DB_PATH) as db:
-        rows = await (
-            await db.execute(
-                "SELECT platform, app_id, title, url, started_at, ends_at "
-                "FROM deals WHERE region=? ORDER BY platform, title",
-                (region,),
+async def prune_announcements() -> int:
+    """
+    Drop ledger rows for deals that expired more than ANNOUNCE_LEDGER_GRACE ago,
+    and rows whose deal is no longer stored at all.
+    """
+    cutoff = int(time.time()) - ANNOUNCE_LEDGER_GRACE
+    async with DB.transaction() as db:
+        cur = await db.execute(
+            "DELETE FROM announcements WHERE expires_at IS NOT NULL AND expires_at < ?",
+            (cutoff,),
+        )
+        removed = cur.rowcount
+        cur = await db.execute(
+            """
+        DELETE FROM announcements WHERE NOT EXISTS (
+            SELECT 1 FROM deals d
+            WHERE d.platform = announcements.platform
+              AND d.app_id = announcements.app_id
+              AND d.region = announcements.region
+        )"""
+        )
+        removed += cur.rowcount
+    return removed
+
+
+async def sweep_expired_deals(now: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Mark active deals past their end time as ended, then archive or delete
+    rows that ended more than DEAL_RETENTION ago. Each batch of
+    DEAL_SWEEP_BATCH rows is its own transaction, so polls writing in
+    between never wait long for the lock. Returns (ended, removed).
+    """
+    now = now or int(time.time())
+    ended = removed = 0
+    while True:
+        async with DB.transaction() as db:
+            cur = await db.execute(
+                "UPDATE deals SET ended_at=ends_at WHERE rowid IN ("
+                "SELECT rowid FROM deals WHERE ended_at IS NULL AND ends_at <= ? LIMIT ?)",
+                (now, DEAL_SWEEP_BATCH),
             )
-        ).fetchall()
+            batch = cur.rowcount
+        ended += batch
+        if batch < DEAL_SWEEP_BATCH:
+            break
+    while True:
+        async with DB.transaction() as db:
+            async with db.execute(
+                "SELECT rowid FROM deals WHERE ended_at < ? LIMIT ?",
+                (now - DEAL_RETENTION, DEAL_SWEEP_BATCH),
+            ) as cur:
+                rowids = [(r[0],) for r in await cur.fetchall()]
+            if ARCHIVE_ENDED_DEALS:
+                await db.executemany(
+                    "INSERT INTO deals_archive "
+                    "SELECT platform, app_id, region, title, url, starts_at, ends_at, last_seen, ended_at "
+                    "FROM deals WHERE rowid=?",
+                    rowids,
+                )
+            await db.executemany("DELETE FROM deals WHERE rowid=?", rowids)
+        removed += len(rowids)
+        if len(rowids) < DEAL_SWEEP_BATCH:
+            break
+    return ended, removed
+
+
+# Set whenever stored Epic windows change, to re-arm promo_boundary_watcher
+epic_windows_changed = asyncio.Event()
+
+
+async def store_epic_windows(region: str, offers: List[Dict]):
+    """Replace a region's stored Epic promo windows with a freshly parsed feed."""
+    async with DB.transaction() as db:
+        await db.execute("DELETE FROM epic_promo_windows WHERE region=?", (region,))
+        await db.executemany(
+            "INSERT OR REPLACE INTO epic_promo_windows "
+            "(region, app_id, starts_at, ends_at, title, url) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (region, o["app_id"], start, end, o["title"], o["url"])
+                for o in offers
+                for start, end in o["windows"]
+            ],
+        )
+    epic_windows_changed.set()
+
+
+async def next_epic_boundary(after: int) -> Optional[int]:
+    """Earliest promo start or end (first second past ends_at) later than `after`."""
+    row = await DB.fetchone(
+        "SELECT MIN(t) FROM ("
+        "SELECT MIN(starts_at) AS t FROM epic_promo_windows WHERE starts_at > ? "
+        "UNION ALL SELECT MIN(ends_at) + 1 FROM epic_promo_windows WHERE ends_at + 1 > ?)",
+        (after, after),
+    )
+    return row[0] if row and row[0] is not None else None
+
+
+async def epic_regions_crossing(after: int, until: int) -> List[str]:
+    """Regions with a promo starting or ending in (after, until]."""
+    rows = await DB.fetchall(
+        "SELECT region FROM epic_promo_windows WHERE starts_at > ? AND starts_at <= ? "
+        "UNION SELECT region FROM epic_promo_windows WHERE ends_at + 1 > ? AND ends_at + 1 <= ?",
+        (after, until, after, until),
+    )
+    return [r[0] for r in rows]
+
+
+async def get_active_epic_deals(region: str, now: int) -> List[Deal]:
+    rows = await DB.fetchall(
+        "SELECT app_id, title, url, MIN(starts_at), ends_at FROM epic_promo_windows "
+        "WHERE region=? AND starts_at <= ? AND ends_at >= ? GROUP BY app_id",
+        (region, now, now),
+    )
     return [
-        {
-            "platform": r[0],
-            "app_id": r[1],
-            "title": r[2],
-            "url": r[3],
-            "started_at": r[4],
-            "ends_at": r[5],
-        }
-        for r in rows
+        Deal("epic", region, app_id, title, url, start, end)
+        for app_id, title, url, start, end in rows
     ]
 
 
-async def deal_exists(platform: str, app_id: str, region: str) -> bool:
-    async with aiosqlite.connect(DB_PATH) as db:
-        row = await (
-            await db.execute(
-                "SELECT 1 FROM deals WHERE platform=? AND app_id=? AND region=?",
-                (platform, app_id, region),
-            )
-        ).fetchone()
-    return row is not None
+async def acquire_fetch_lease(region: str, source: str) -> bool:
+    """Take (or renew) the fetch lease for region/source unless another live process holds it."""
+    now = time.time()
+    async with DB.transaction() as db:
+        cur = await db.execute(
+            """
+        INSERT INTO fetch_leases (region, source, holder, expires_at) VALUES (?, ?, ?, ?)
+        ON CONFLICT(region, source) DO UPDATE SET
+          holder=excluded.holder,
+          expires_at=excluded.expires_at
+        WHERE fetch_leases.expires_at < ? OR fetch_leases.holder = excluded.holder
+        """,
+            (region, source, INSTANCE_ID, now + FETCH_LEASE_SECONDS, now),
+        )
+        return cur.rowcount == 1
 
 
-async def get_guild_settings(guild_id: int):
-    async with aiosqlite.connect(DB_PATH) as db:
-        row = await (
-            await db.execute(
-                "SELECT region, channel_id FROM guild_settings WHERE guild_id=?",
-                (guild_id,),
-            )
-        ).fetchone()
+async def release_fetch_lease(region: str, source: str):
+    await DB.execute(
+        "DELETE FROM fetch_leases WHERE region=? AND source=? AND holder=?",
+        (region, source, INSTANCE_ID),
+    )
+
+
+async def publish_region_results(region: str, source: str, deals: List[Deal], fetched_at: float):
+    await DB.execute(
+        """
+        INSERT INTO region_results (region, source, deals_json, fetched_at, fetched_by, complete)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(region, source) DO UPDATE SET
+          deals_json=excluded.deals_json,
+          fetched_at=excluded.fetched_at,
+          fetched_by=excluded.fetched_by,
+          complete=excluded.complete
+        """,
+        (
+            region,
+            source,
+            json.dumps([d.to_row() for d in deals]),
+            fetched_at,
+            INSTANCE_ID,
+            0 if isinstance(deals, PartialDeals) else 1,
+        ),
+    )
+
+
+def shared_deals(deals_json: str, complete: int) -> List[Deal]:
+    deals = [Deal.from_row(r) for r in json.loads(deals_json)]
+    return deals if complete else PartialDeals(deals)
+
+
+async def load_region_results(region: str, source: str) -> Optional[Tuple[List[Deal], float]]:
+    """Latest shared (deals, fetched_at) for region/source, from any process."""
+    row = await DB.fetchone(
+        "SELECT deals_json, fetched_at, complete FROM region_results WHERE region=? AND source=?",
+        (region, source),
+    )
+    if not row:
+        return None
+    try:
+        return shared_deals(row[0], row[2]), row[1]
+    except (TypeError, ValueError):
+        # Written by an older version in another format; treat as missing
+        return None
+
+
+async def load_all_region_results() -> List[Tuple[str, str, List[Deal], float]]:
+    """Every shared (region, source, deals, fetched_at), for a warm start."""
+    out = []
+    for region, source, deals_json, fetched_at, complete in await DB.fetchall(
+        "SELECT region, source, deals_json, fetched_at, complete FROM region_results"
+    ):
+        try:
+            out.append((region, source, shared_deals(deals_json, complete), fetched_at))
+        except (TypeError, ValueError):
+            continue
+    return out
+
+
+async def save_http_validator(url: str, entry: Dict):
+    await DB.execute(
+        """
+        INSERT INTO http_validators (url, etag, last_modified, hash, value_json, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(url) DO UPDATE SET
+          etag=excluded.etag,
+          last_modified=excluded.last_modified,
+          hash=excluded.hash,
+          value_json=excluded.value_json,
+          updated_at=excluded.updated_at
+        """,
+        (
+            url,
+            entry["etag"],
+            entry["last_modified"],
+            entry["hash"],
+            json.dumps(entry["value"]),
+            int(time.time()),
+        ),
+    )
+
+
+async def load_http_validators() -> Dict[str, Dict]:
+    rows = await DB.fetchall(
+        "SELECT url, etag, last_modified, hash, value_json FROM http_validators"
+    )
+    return {
+        url: {"etag": etag, "last_modified": lm, "hash": digest, "value": json.loads(value)}
+        for url, etag, lm, digest, value in rows
+    }
+
+
+async def get_meta(key: str) -> Optional[str]:
+    row = await DB.fetchone("SELECT value FROM meta WHERE key=?", (key,))
+    return row[0] if row else None
+
+
+async def set_meta(key: str, value: str):
+    await DB.execute(
+        "INSERT INTO meta (key, value) VALUES (?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+        (key, value),
+    )
+
+
+# guild_id -> {"region", "channel_id"}: every stored row, loaded once at
+# startup and kept current by the setters (write-through). A guild is only
+# ever served by one shard process, so nothing else writes its row.
+GUILD_SETTINGS: Dict[int, Dict] = {}
+
+
+def get_guild_settings(guild_id: int) -> Dict:
+    """Cached settings for a guild (no DB access); defaults when it has none."""
+    return GUILD_SETTINGS.get(guild_id) or {"region": "US", "channel_id": None}
+
+
+async def load_all_guild_settings() -> Dict[int, Dict]:
+    rows = await DB.fetchall("SELECT guild_id, region, channel_id FROM guild_settings")
+    return {gid: {"region": region or "US", "channel_id": channel_id} for gid, region, channel_id in rows}
+
+
+async def load_guild_settings(guild_id: int):
+    """(Re)load one guild's row into the cache, e.g. when the bot rejoins it."""
+    row = await DB.fetchone(
+        "SELECT region, channel_id FROM guild_settings WHERE guild_id=?",
+        (guild_id,),
+    )
     if row:
-        return {"region": row[0], "channel_id": row[1]}
-    return {"region": "US", "channel_id": None}
+        GUILD_SETTINGS[guild_id] = {"region": row[0] or "US", "channel_id": row[1]}
+
+
+def evict_guild_settings(guild_id: int):
+    GUILD_SETTINGS.pop(guild_id, None)
 
 
 async def set_guild_region(guild_id: int, region: str):
@@ -131,58 +1078,554 @@ async def set_guild_region(guild_id: int, region: str):
         raise ValueError(
             "Region must be a 2-letter country code (ISO 3166-1 alpha-2)."
         )
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(
-            """
+    await DB.execute(
+        """
         INSERT INTO guild_settings (guild_id, region) VALUES (?, ?)
         ON CONFLICT(guild_id) DO UPDATE SET region=excluded.region
         """,
-            (guild_id, region),
-        )
-        await db.commit()
+        (guild_id, region),
+    )
+    GUILD_SETTINGS[guild_id] = {**get_guild_settings(guild_id), "region": region}
 
 
 async def set_guild_channel(guild_id: int, channel_id: int):
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(
-            """
+    await DB.execute(
+        """
         INSERT INTO guild_settings (guild_id, channel_id) VALUES (?, ?)
         ON CONFLICT(guild_id) DO UPDATE SET channel_id=excluded.channel_id
         """,
-            (guild_id, channel_id),
-        )
-        await db.commit()
+        (guild_id, channel_id),
+    )
+    GUILD_SETTINGS[guild_id] = {**get_guild_settings(guild_id), "channel_id": channel_id}
 
 
 # ----------------- HTTP -----------------
 
 
-async def fetch_json(session: aiohttp.ClientSession, url: str):
-    async with session.get(url, timeout=aiohttp.ClientTimeout(total=25)) as resp:
-        resp.raise_for_status()
-        return await resp.json()
-    
-async def try_fetch_json(session: aiohttp.ClientSession, url: str):
+HTTP_HEADERS = {"User-Agent": "freewatch/1.0"}
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=HTTP_TIMEOUT_SECONDS, sock_connect=10)
+
+_http_session: Optional[aiohttp.ClientSession] = None
+HTTP_POOL_STATS = {
+    "requests": 0,
+    "in_flight": 0,
+    "connections_opened": 0,
+    "connections_reused": 0,
+}
+
+
+def _pool_trace_config() -> aiohttp.TraceConfig:
+    trace = aiohttp.TraceConfig()
+
+    async def on_request_start(session, ctx, params):
+        HTTP_POOL_STATS["requests"] += 1
+        HTTP_POOL_STATS["in_flight"] += 1
+        ctx.started = time.perf_counter()
+
+    async def on_request_done(session, ctx, params):
+        HTTP_POOL_STATS["in_flight"] -= 1
+        host = params.url.host or ""
+        response = getattr(params, "response", None)
+        status = str(response.status) if response is not None else "error"
+        METRICS.inc("http_requests_total", host=host, status=status)
+        METRICS.observe("http_request_seconds", time.perf_counter() - ctx.started, host=host)
+
+    async def on_connection_create_end(session, ctx, params):
+        HTTP_POOL_STATS["connections_opened"] += 1
+
+    async def on_connection_reuseconn(session, ctx, params):
+        HTTP_POOL_STATS["connections_reused"] += 1
+
+    trace.on_request_start.append(on_request_start)
+    trace.on_request_end.append(on_request_done)
+    trace.on_request_exception.append(on_request_done)
+    trace.on_connection_create_end.append(on_connection_create_end)
+    trace.on_connection_reuseconn.append(on_connection_reuseconn)
+    return trace
+
+
+async def open_http_session() -> aiohttp.ClientSession:
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_PER_HOST_LIMIT,
+            keepalive_timeout=HTTP_KEEPALIVE_SECONDS,
+            ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        )
+        _http_session = aiohttp.ClientSession(
+            headers=HTTP_HEADERS,
+            timeout=HTTP_TIMEOUT,
+            connector=connector,
+            trace_configs=[_pool_trace_config()],
+        )
+    return _http_session
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    if _http_session is None or _http_session.closed:
+        raise RuntimeError("HTTP session is not open; call open_http_session() first.")
+    return _http_session
+
+
+async def close_http_session():
+    global _http_session
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
+
+
+def http_pool_metrics() -> Dict[str, int]:
+    stats = dict(HTTP_POOL_STATS)
+    connector = _http_session.connector if _http_session else None
+    # aiohttp doesn't expose pool occupancy publicly
+    idle = getattr(connector, "_conns", None) or {}
+    stats["connections_idle"] = sum(len(v) for v in idle.values())
+    stats["connections_in_use"] = len(getattr(connector, "_acquired", None) or ())
+    return stats
+
+
+def _collect_pool_metrics():
+    for key, value in http_pool_metrics().items():
+        METRICS.set("http_pool", value, stat=key)
+
+
+METRICS.describe("http_pool", "gauge", "Shared HTTP connection pool counters")
+METRICS.collectors.append(_collect_pool_metrics)
+
+
+class HostUnavailable(aiohttp.ClientError):
+    """A host's circuit breaker is open; the request was not sent."""
+
+
+class ResponseTooLarge(aiohttp.ClientError):
+    """The response body exceeded HTTP_MAX_BODY_BYTES."""
+
+
+async def read_body(resp: aiohttp.ClientResponse) -> bytearray:
+    """Read the body in chunks, giving up as soon as it passes HTTP_MAX_BODY_BYTES."""
+    if resp.content_length is not None and resp.content_length > HTTP_MAX_BODY_BYTES:
+        raise ResponseTooLarge(f"{resp.url.host}: Content-Length {resp.content_length}")
+    body = bytearray()
+    async for chunk in resp.content.iter_chunked(64 * 1024):
+        body += chunk
+        if len(body) > HTTP_MAX_BODY_BYTES:
+            raise ResponseTooLarge(f"{resp.url.host}: body over {HTTP_MAX_BODY_BYTES} bytes")
+    return body
+
+
+class HostPolicy:
+    """
+    Per-host token bucket plus circuit breaker. The bucket smooths bursts
+    (and is paused as a whole when the host answers 429 with Retry-After);
+    after HTTP_BREAKER_FAILURES consecutive failures the breaker opens and
+    requests fail fast until the cooldown ends, then one probe is let through.
+    """
+
+    def __init__(self, host: str):
+        self.host = host
+        self.rate = HTTP_HOST_RATES.get(host, SOURCE_HOST_RATES.get(host, HTTP_HOST_RATE))
+        self.burst = max(1, HTTP_HOST_BURST)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.failures = 0
+        self.open_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def check_circuit(self):
+        if self.failures < HTTP_BREAKER_FAILURES:
+            return
+        now = time.monotonic()
+        if now < self.open_until:
+            raise HostUnavailable(f"{self.host} paused after {self.failures} failures")
+        # Cooldown over: let this one request probe the host; the rest keep
+        # failing fast until it succeeds (which closes the breaker)
+        self.open_until = now + HTTP_BREAKER_COOLDOWN
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                if self.rate <= 0:
+                    return
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def record(self, ok: bool):
+        if ok:
+            self.failures = 0
+            return
+        self.failures += 1
+        if self.failures >= HTTP_BREAKER_FAILURES:
+            if self.failures == HTTP_BREAKER_FAILURES:
+                print(f"[http] {self.host}: {self.failures} failures in a row, pausing")
+                METRICS.inc("http_circuit_open_total", host=self.host)
+            self.open_until = time.monotonic() + HTTP_BREAKER_COOLDOWN
+
+
+HOST_POLICIES: Dict[str, HostPolicy] = {}
+# host -> requests/second a registered source asked for (see register_source)
+SOURCE_HOST_RATES: Dict[str, float] = {}
+
+
+def host_policy(host: str) -> HostPolicy:
+    policy = HOST_POLICIES.get(host)
+    if policy is None:
+        policy = HOST_POLICIES[host] = HostPolicy(host)
+    return policy
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff, capped at HTTP_BACKOFF_MAX."""
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * 2**attempt))
+
+
+async def http_get(
+    session: aiohttp.ClientSession, url: str, headers: Optional[Dict[str, str]] = None
+) -> Tuple[int, Any, bytes]:
+    """
+    GET through the host's rate limiter and circuit breaker, retrying
+    429 / 5xx / network errors with backoff (or the server's Retry-After).
+    Returns (status, headers, body) for 2xx and 304; other statuses raise
+    aiohttp.ClientResponseError, an open breaker raises HostUnavailable.
+    """
+    host = urlsplit(url).hostname or ""
+    policy = host_policy(host)
+    for attempt in range(HTTP_RETRIES + 1):
+        policy.check_circuit()
+        await policy.acquire()
+        delay: Optional[float] = None
+        try:
+            async with session.get(url, timeout=HTTP_TIMEOUT, headers=headers) as resp:
+                if resp.status < 400:
+                    body = await read_body(resp)
+                    policy.record(True)
+                    return resp.status, resp.headers, body
+                if resp.status != 429 and resp.status < 500:
+                    # A problem with this URL, not the host: no retry, no breaker strike
+                    policy.record(True)
+                    resp.raise_for_status()
+                policy.record(False)
+                error: Exception = aiohttp.ClientResponseError(
+                    resp.request_info, resp.history, status=resp.status, message=resp.reason or ""
+                )
+                reason = str(resp.status)
+                delay = retry_after_seconds(resp.headers.get("Retry-After"))
+                if resp.status == 429:
+                    # The whole host waits out the full Retry-After, not just this request
+                    delay = delay if delay is not None else backoff_delay(attempt)
+                    policy.pause(delay)
+        except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+            policy.record(False)
+            error, reason = e, type(e).__name__
+        if attempt >= HTTP_RETRIES or policy.failures >= HTTP_BREAKER_FAILURES:
+            raise error
+        if delay is not None and delay > HTTP_BACKOFF_MAX:
+            # Don't come back early, and don't hold the caller that long: give up
+            # on this request (a 429 has paused the host for the full Retry-After)
+            raise error
+        METRICS.inc("http_retries_total", host=host, reason=reason)
+        await asyncio.sleep(delay if delay is not None else backoff_delay(attempt))
+    raise error
+
+
+# Keys the fetchers actually read. Decoding with one of these drops every
+# other key as each object is built, so unused subtrees (images, tags,
+# descriptions, ...) are freed immediately instead of living in the result.
+EPIC_FEED_KEYS = frozenset(
+    {
+        "data", "Catalog", "searchStore", "catalogOffers", "elements",
+        "title", "id", "productId", "productSlug", "urlSlug",
+        "offerMappings", "catalogNs", "mappings", "pageSlug",
+        "price", "totalPrice", "originalPrice",
+        "promotions", "promotionalOffers", "upcomingPromotionalOffers",
+        "startDate", "endDate", "discountSetting", "discountType", "discountPercentage",
+    }
+)
+STEAM_SEARCH_KEYS = frozenset({"results_html", "total_count"})
+
+
+def decode_json(body: bytes, keep: Optional[AbstractSet[str]] = None) -> Any:
+    if keep is None:
+        return json.loads(body)
+    return json.loads(body, object_pairs_hook=lambda pairs: {k: v for k, v in pairs if k in keep})
+
+
+async def fetch_json(
+    session: aiohttp.ClientSession, url: str, keep: Optional[AbstractSet[str]] = None
+):
+    _, _, body = await http_get(session, url)
+    return decode_json(body, keep)
+
+
+# url -> {"etag", "last_modified", "hash", "value"} for conditionally fetched feeds
+HTTP_VALIDATORS: Dict[str, Dict] = {}
+
+
+async def fetch_json_conditional(
+    session: aiohttp.ClientSession,
+    url: str,
+    transform: Optional[Callable[[Any], Any]] = None,
+    keep: Optional[AbstractSet[str]] = None,
+) -> Tuple[Any, bool]:
+    """
+    GET a JSON feed with If-None-Match / If-Modified-Since from the previous
+    response. Returns (value, changed): on a 304, or a 200 whose body hashes
+    the same as last time, the previous value is returned without parsing.
+    `transform` is applied to freshly decoded JSON and its result is what
+    gets cached, so callers can keep just the parts they need; `keep`
+    prunes the decode itself (see decode_json).
+    """
+    prev = HTTP_VALIDATORS.get(url)
+    headers = {}
+    if prev:
+        if prev.get("etag"):
+            headers["If-None-Match"] = prev["etag"]
+        if prev.get("last_modified"):
+            headers["If-Modified-Since"] = prev["last_modified"]
+    status, resp_headers, body = await http_get(session, url, headers)
+    if status == 304:
+        if prev:
+            METRICS.inc("http_conditional_total", result="not_modified")
+            return prev["value"], False
+        raise RuntimeError(f"304 without a cached response for {url}")
+    etag = resp_headers.get("ETag")
+    last_modified = resp_headers.get("Last-Modified")
+
+    digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+    if prev and prev["hash"] == digest:
+        if (prev["etag"], prev["last_modified"]) != (etag, last_modified):
+            prev.update(etag=etag, last_modified=last_modified)
+            await _persist_validator(url, prev)
+        METRICS.inc("http_conditional_total", result="same_body")
+        return prev["value"], False
+    METRICS.inc("http_conditional_total", result="changed")
+
+    value = decode_json(body, keep)
+    if transform is not None:
+        value = transform(value)
+    entry = HTTP_VALIDATORS[url] = {
+        "etag": etag,
+        "last_modified": last_modified,
+        "hash": digest,
+        "value": value,
+    }
+    await _persist_validator(url, entry)
+    return value, True
+
+
+async def _persist_validator(url: str, entry: Dict):
+    # Only for warm starts: losing a write costs one full download after a restart
     try:
-        return await fetch_json(session, url)
+        await save_http_validator(url, entry)
+    except Exception as e:
+        print(f"[http] saving validators for {url} failed: {e}")
+
+async def try_fetch_json(
+    session: aiohttp.ClientSession, url: str, keep: Optional[AbstractSet[str]] = None
+):
+    try:
+        return await fetch_json(session, url, keep)
     except Exception as e:
         return {"__error__": str(e)}
 
 
-# ----------------- Fetchers -----------------
+# ----------------- Steam appdetails cache -----------------
 
+# SQLite caps bound parameters per statement; stay well below it
+SQL_IN_CHUNK = 500
 
-async def get_epic_free_promos(session: aiohttp.ClientSession, region: str = "US"):
+
+async def steam_cache_load(appids: List[int], cc: str) -> Dict[int, Dict]:
+    """Load cached appdetails entries for the given appids."""
+    out: Dict[int, Dict] = {}
+    if not appids:
+        return out
+    for i in range(0, len(appids), SQL_IN_CHUNK):
+        chunk = appids[i : i + SQL_IN_CHUNK]
+        marks = ",".join("?" * len(chunk))
+        rows = await DB.fetchall(
+            "SELECT appid, success, app_type, name, static_fetched_at, "
+            "price_json, price_fetched_at FROM steam_app_cache "
+            f"WHERE cc=? AND appid IN ({marks})",
+            (cc, *chunk),
+        )
+        for r in rows:
+            out[r[0]] = {
+                "success": bool(r[1]),
+                "type": r[2],
+                "name": r[3],
+                "static_fetched_at": r[4] or 0,
+                "price_overview": json.loads(r[5]) if r[5] else None,
+                "price_fetched_at": r[6] or 0,
+            }
+    return out
+
+
+async def steam_cache_store(cc: str, entries: Dict[int, Dict], touched: List[int]):
     """
-    Returns list of dicts: {app_id, title, url, started_at, ends_at}
-    Includes only promos that are 100% off within the current time window and originally paid (US-like logic).
+    Write refreshed entries, bump LRU timestamps for every appid used this
+    round, then evict the least recently used rows beyond STEAM_CACHE_MAX_ENTRIES.
     """
-    url = (
-        "https://store-site-backend-static.ak.epicgames.com/freeGamesPromotions?"
-        f"locale=en-US&country={region}&allowCountries={region}"
-    )
-    data = await fetch_json(session, url)
+    now = int(time.time())
+    async with DB.transaction() as db:
+        if entries:
+            await db.executemany(
+                """
+            INSERT INTO steam_app_cache (appid, cc, success, app_type, name,
+                static_fetched_at, price_json, price_fetched_at, last_used_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(appid, cc) DO UPDATE SET
+              success=excluded.success,
+              app_type=excluded.app_type,
+              name=excluded.name,
+              static_fetched_at=excluded.static_fetched_at,
+              price_json=excluded.price_json,
+              price_fetched_at=excluded.price_fetched_at,
+              last_used_at=excluded.last_used_at
+            """,
+                [
+                    (
+                        appid,
+                        cc,
+                        int(e["success"]),
+                        e.get("type"),
+                        e.get("name"),
+                        e.get("static_fetched_at"),
+                        json.dumps(e["price_overview"]) if e.get("price_overview") else None,
+                        e.get("price_fetched_at"),
+                        now,
+                    )
+                    for appid, e in entries.items()
+                ],
+            )
+        hits = [a for a in touched if a not in entries]
+        if hits:
+            await db.executemany(
+                "UPDATE steam_app_cache SET last_used_at=? WHERE appid=? AND cc=?",
+                [(now, a, cc) for a in hits],
+            )
+        async with db.execute("SELECT COUNT(*) FROM steam_app_cache") as cur:
+            row = await cur.fetchone()
+        overflow = (row[0] if row else 0) - STEAM_CACHE_MAX_ENTRIES
+        if overflow > 0:
+            await db.execute(
+                "DELETE FROM steam_app_cache WHERE rowid IN ("
+                "SELECT rowid FROM steam_app_cache ORDER BY last_used_at ASC LIMIT ?)",
+                (overflow,),
+            )
+
+
+# ----------------- Steam search parsing -----------------
+
+# One compiled scan over results_html: each row is an <a ... data-ds-*> tag
+# followed by its body up to the next row. Field patterns search that span
+# in place (pos/endpos), so the blob is never sliced or copied.
+_STEAM_ROW_TAG_RE = re.compile(r"<a\s[^>]*?data-ds-(?:appid|packageid|bundleid)=[^>]*>")
+_STEAM_APPIDS_RE = re.compile(r'data-ds-appid="([\d,]+)"')
+_STEAM_PACKAGE_RE = re.compile(r'data-ds-(?:packageid|bundleid)="\d')
+_STEAM_TITLE_RE = re.compile(r'<span class="title">([^<]*)</span>')
+_STEAM_DISCOUNT_RE = re.compile(r'data-discount="(\d+)"')
+_STEAM_PRICE_FINAL_RE = re.compile(r'data-price-final="(\d+)"')
+_STEAM_DISCOUNT_PCT_RE = re.compile(r'class="discount_pct">\s*-?(\d+)%')
+_STEAM_ORIGINAL_RE = re.compile(r'class="discount_original_price">([^<]+)<')
+# Older search markup: <strike>$19.99</strike>
+_STEAM_STRIKE_RE = re.compile(r"<strike>([^<]+)</strike>")
+
+
+class SteamSearchRow(NamedTuple):
+    appids: Tuple[int, ...]
+    # Package/bundle rows list their apps; the row's price is the package's
+    is_package: bool
+    title: str
+    original_price: Optional[str]
+    final_cents: Optional[int]
+    discount_percent: Optional[int]
+
+
+def parse_steam_search_rows(results_html: str) -> Iterator[SteamSearchRow]:
+    """Yield one SteamSearchRow per result row of a search `results_html` blob."""
+    tags = list(_STEAM_ROW_TAG_RE.finditer(results_html))
+    for i, tag in enumerate(tags):
+        head = tag.group(0)
+        m = _STEAM_APPIDS_RE.search(head)
+        if not m:
+            continue
+        start = tag.end()
+        end = tags[i + 1].start() if i + 1 < len(tags) else len(results_html)
+
+        title = _STEAM_TITLE_RE.search(results_html, start, end)
+        discount = _STEAM_DISCOUNT_RE.search(results_html, start, end) or _STEAM_DISCOUNT_PCT_RE.search(
+            results_html, start, end
+        )
+        final = _STEAM_PRICE_FINAL_RE.search(results_html, start, end)
+        original = _STEAM_ORIGINAL_RE.search(results_html, start, end) or _STEAM_STRIKE_RE.search(
+            results_html, start, end
+        )
+        yield SteamSearchRow(
+            appids=tuple(int(a) for a in m.group(1).split(",") if a),
+            is_package=_STEAM_PACKAGE_RE.search(head) is not None,
+            title=html.unescape(title.group(1)).strip() if title else "",
+            original_price=original.group(1).strip() if original else None,
+            final_cents=int(final.group(1)) if final else None,
+            discount_percent=int(discount.group(1)) if discount else None,
+        )
+
+
+def steam_row_verdict(row: SteamSearchRow) -> Optional[bool]:
+    """
+    Decide from the search row alone whether an app is a paid->free promo:
+    True (free now, was paid), False (not a promo), None (ask appdetails).
+    """
+    if row.is_package:
+        return None
+    if row.discount_percent is None and row.final_cents is None:
+        return None
+    free_now = row.discount_percent == 100 or row.final_cents == 0
+    if free_now and row.original_price:
+        return True
+    if free_now and not row.discount_percent:
+        # $0 with no discount: permanently free
+        return False
+    if row.final_cents is not None and row.final_cents > 0:
+        return False
+    return None
+
+
+# ----------------- Fetchers -----------------
 
+
+def parse_epic_offers(data: Dict) -> List[Dict]:
+    """
+    Parse the freeGamesPromotions feed once into originally-paid offers with
+    their 100%-off promo windows, current and upcoming, as (start, end) epoch
+    seconds. Later polls only compare windows against the clock.
+    """
     # EGS returns either "searchStore.elements" or "catalogOffers.elements"
     games = (
         data.get("data", {}).get("Catalog", {}).get("searchStore", {}).get("elements", [])
@@ -195,9 +1638,7 @@ async def get_epic_free_promos(session: aiohttp.ClientSession, region: str = "US
             .get("elements", [])
         )
 
-    results = []
-    now = datetime.now(timezone.utc)
-
+    offers = []
     for g in games:
         title = g.get("title")
         # Best-effort page slug extraction
@@ -214,59 +1655,112 @@ async def get_epic_free_promos(session: aiohttp.ClientSession, region: str = "US
         price = g.get("price", {})
         total = price.get("totalPrice", {})
         original = total.get("originalPrice", 0)  # cents
-        discount = total.get("discountPrice", 0)  # cents
 
-        # Promotions with 100% off, active now
+        # Only originally paid titles can be "paid -> free".
+        # Do not rely on totalPrice.discountPrice being 0; Epic often leaves it as original.
+        if not original or original <= 0:
+            continue
+
+        # Promotions with 100% off, running now or announced for later
         promos = g.get("promotions") or {}
-        current = promos.get("promotionalOffers") or []
-        active_zero = False
-        start_iso = None
-        end_iso = None
-
-        if current:
-            offers = current[0].get("promotionalOffers", [])
-            for off in offers:
+        windows = []
+        for key in ("promotionalOffers", "upcomingPromotionalOffers"):
+            groups = promos.get(key) or []
+            if not groups:
+                continue
+            for off in groups[0].get("promotionalOffers", []):
                 try:
-                    sd = dtparse.isoparse(off.get("startDate"))
-                    ed = dtparse.isoparse(off.get("endDate"))
+                    sd = int(dtparse.isoparse(off.get("startDate")).timestamp())
+                    ed = int(dtparse.isoparse(off.get("endDate")).timestamp())
                 except Exception:
                     continue
                 ds = off.get("discountSetting") or {}
                 # Epic marks freebies with discountPercentage == 0 in many cases
                 if ds.get("discountType") == "PERCENTAGE" and int(ds.get("discountPercentage", 0)) == 0:
-                    if sd <= now <= ed:
-                        active_zero = True
-                        start_iso = sd.isoformat()
-                        end_iso = ed.isoformat()
-                        break
+                    windows.append((sd, ed))
+        if not windows:
+            continue
+
+        offers.append(
+            {
+                "app_id": str(app_id),
+                "title": title,
+                "url": (
+                    f"https://store.epicgames.com/en-US/p/{product_slug}"
+                    if product_slug
+                    else "https://store.epicgames.com/en-US/"
+                ),
+                "windows": windows,
+            }
+        )
+    return offers
 
-        # Only include: originally paid, currently free (active promo window)
-        # Do not rely on totalPrice.discountPrice being 0; Epic often leaves it as original.
-        if active_zero and original > 0:
-            url = (
-                f"https://store.epicgames.com/en-US/p/{product_slug}"
-                if product_slug
-                else "https://store.epicgames.com/en-US/"
-            )
-            results.append(
-                {
-                    "app_id": str(app_id),
-                    "title": title,
-                    "url": url,
-                    "started_at": start_iso,
-                    "ends_at": end_iso,
-                }
-            )
 
+def epic_feed_url(region: str) -> str:
+    return (
+        f"{EPIC_API_BASE}/freeGamesPromotions?"
+        f"locale=en-US&country={region}&allowCountries={region}"
+    )
+
+
+async def get_epic_free_promos(session: aiohttp.ClientSession, region: str = "US") -> List[Deal]:
+    """
+    Returns the region's live Epic freebies as Deals (with promo start/end).
+    Includes only promos that are 100% off within the current time window and originally paid (US-like logic).
+    The feed is fetched conditionally; an unchanged feed reuses the parsed offers.
+    Upcoming windows are stored so promo_boundary_watcher can act on them on time.
+    """
+    offers, changed = await fetch_json_conditional(
+        session, epic_feed_url(region), transform=parse_epic_offers, keep=EPIC_FEED_KEYS
+    )
+    if changed:
+        try:
+            await store_epic_windows(region, offers)
+        except Exception as e:
+            print(f"[epic] storing promo windows failed ({region}): {e}")
+    return active_epic_deals(region, offers, int(time.time()))
+
+
+def active_epic_deals(region: str, offers: List[Dict], now: int) -> List[Deal]:
+    results = []
+    for o in offers:
+        for start, end in o["windows"]:
+            if start <= now <= end:
+                results.append(Deal("epic", region, o["app_id"], o["title"], o["url"], start, end))
+                break
     return results
 
 
-async def get_steam_free_promos(session: aiohttp.ClientSession, region: str = "US"):
+def steam_price_is_free(price: Optional[Dict]) -> bool:
+    """Originally paid (initial > 0) and currently discounted to zero."""
+    price = price or {}
+    initial = price.get("initial")
+    final = price.get("final")
+    discount_percent = price.get("discount_percent")
+    final_formatted = price.get("final_formatted")
+
+    # Must have been a paid title originally
+    if not isinstance(initial, int) or initial <= 0:
+        return False
+
+    # Consider several signals of 100% discount
+    if isinstance(discount_percent, int) and discount_percent == 100:
+        return True
+    if isinstance(final, int) and final == 0:
+        return True
+    if isinstance(final_formatted, str) and final_formatted.strip().lower() == "free":
+        return True
+    return False
+
+
+async def get_steam_free_promos(session: aiohttp.ClientSession, region: str = "US") -> List[Deal]:
     """
-    Returns list of dicts: {app_id, title, url, started_at(None), ends_at(None)}
+    Returns the region's paid -> free Steam games as Deals (Steam publishes no end time).
     Strategy:
       1) Query Steam search results with specials=1 & maxprice=free (region-aware),
          paginating through all results. This captures all 100%-off items, not just featured.
+         Page 0 reports `total_count`; the remaining pages are fetched concurrently.
+         Rows whose listed price already settles it are accepted/rejected here.
       2) For each found appid, confirm via appdetails (region) that:
          - type == 'game'
          - price_overview.initial > 0 (exclude permanently free titles)
@@ -274,140 +1768,680 @@ async def get_steam_free_promos(session: aiohttp.ClientSession, region: str = "U
              - price_overview.discount_percent == 100
              - price_overview.final == 0
              - price_overview.final_formatted == 'Free'
+         Appids stream into this stage as each search page arrives.
     """
     # 1) Collect all appids from search pages
     #    Use category1=998 to bias toward Games in search results; we'll still verify type via appdetails.
     #    The endpoint returns JSON with `results_html` and `total_count`.
-    def build_search_url(start: int, count: int = 50) -> str:
+    page_size = 50
+
+    def build_search_url(start: int, count: int = page_size) -> str:
         return (
-            "https://store.steampowered.com/search/results/?"
+            f"{STEAM_STORE_BASE}/search/results/?"
             f"query&start={start}&count={count}"
             "&specials=1&maxprice=free"
             f"&cc={region}&l=en&infinite=1&category1=998"
         )
 
+    def page_rows(page: Optional[Dict]) -> List[SteamSearchRow]:
+        return list(parse_steam_search_rows((page or {}).get("results_html") or ""))
+
+    # 2) Verify via appdetails with robust price checks.
+    #    Steam accepts many appids per request only with filters=price_overview,
+    #    so prices are resolved in batches first; full details (type, name) are
+    #    then fetched only for price-qualified apps whose cached details are stale.
+    #    Fresh cache entries skip the network entirely.
     appids: List[int] = []
     seen_ids = set()
-    start = 0
-    total = None
-    # Cap pages defensively
-    max_pages = 40
-    pages = 0
-    while pages < max_pages:
-        pages += 1
-        url = build_search_url(start)
-        try:
-            page = await fetch_json(session, url)
-        except Exception:
-            break
-
-        results_html = (page or {}).get("results_html") or ""
-        # Extract appids only (ignore packages/bundles)
-        ids = [int(m) for m in re.findall(r'data-ds-appid=\"(\d+)\"', results_html)]
-        for i in ids:
-            if i not in seen_ids:
-                seen_ids.add(i)
-                appids.append(i)
-
-        if total is None:
-            total = int((page or {}).get("total_count") or 0)
-        # Advance
-        start += 50
-        # Stop if we've collected as many as reported, or no new ids are returned
-        if total is not None and len(appids) >= total:
-            break
-        if not ids:
-            break
-
-    # Fallback: if search returned nothing, try featured specials as a backup source
-    if not appids:
-        try:
-            featured_url = (
-                f"https://store.steampowered.com/api/featuredcategories?cc={region}&l=en"
-            )
-            data = await fetch_json(session, featured_url)
-            specials = (data.get("specials") or {}).get("items", []) or []
-            for item in specials:
-                i = item.get("id")
-                if isinstance(i, int) and i not in seen_ids:
-                    seen_ids.add(i)
-                    appids.append(i)
-        except Exception:
-            pass
-
-    # 2) Verify via appdetails with robust price checks
-    results: List[Dict] = []
-
-    async def fetch_details(appid: int):
-        base = f"https://store.steampowered.com/api/appdetails?appids={appid}"
-        return await fetch_json(session, f"{base}&cc={region}&l=en")
+    rows_seen = 0
+    # Apps the search row already showed as paid -> free, and their row titles
+    row_free: Set[int] = set()
+    row_titles: Dict[int, str] = {}
+    cache: Dict[int, Dict] = {}
+    refreshed: Dict[int, Dict] = {}
+    need_price: List[int] = []
+    price_tasks: List[asyncio.Task] = []
+    # Failures that survived fetch_json's retries; their last cached answers are used instead
+    failed_pages: List[int] = []
+    price_failed: Set[int] = set()
+    static_failed: List[int] = []
+    now = int(time.time())
+
+    def static_fresh(e: Optional[Dict]) -> bool:
+        return bool(e) and now - e["static_fetched_at"] <= STEAM_CACHE_STATIC_TTL
+
+    def price_fresh(e: Optional[Dict]) -> bool:
+        return bool(e) and now - e["price_fetched_at"] <= STEAM_CACHE_PRICE_TTL
+
+    def known_non_game(e: Optional[Dict]) -> bool:
+        return static_fresh(e) and (not e["success"] or e["type"] != "game")
+
+    def appdetails_url(ids: List[int], filters: str) -> str:
+        joined = ",".join(str(i) for i in ids)
+        return (
+            f"{STEAM_STORE_BASE}/api/appdetails?"
+            f"appids={joined}&filters={filters}&cc={region}&l=en"
+        )
 
     # Limit concurrency to be gentle
     sem = asyncio.Semaphore(10)
 
-    async def process_app(appid: int):
+    async def fetch_price_batch(batch: List[int]):
         async with sem:
             try:
-                details = await fetch_details(appid)
+                data = await fetch_json(session, appdetails_url(batch, "price_overview"))
             except Exception:
-                return None
-            block = (details or {}).get(str(appid), {})
+                price_failed.update(batch)
+                return
+        for appid in batch:
+            block = (data or {}).get(str(appid)) or {}
+            d = block.get("data")
+            # Apps without a price come back as `data: []`
+            if not isinstance(d, dict):
+                d = {}
+            e = dict(
+                cache.get(appid)
+                or {"success": True, "type": None, "name": None, "static_fetched_at": 0}
+            )
             if not block.get("success"):
-                return None
-            d = block.get("data") or {}
-            if d.get("type") != "game":
-                return None
-
-            price = d.get("price_overview") or {}
-            initial = price.get("initial")
-            final = price.get("final")
-            discount_percent = price.get("discount_percent")
-            final_formatted = price.get("final_formatted")
-
-            # Must have been a paid title originally
-            if not isinstance(initial, int) or initial <= 0:
-                return None
-
-            # Consider several signals of 100% discount
-            is_free_now = False
-            if isinstance(discount_percent, int) and discount_percent == 100:
-                is_free_now = True
-            elif isinstance(final, int) and final == 0:
-                is_free_now = True
-            elif isinstance(final_formatted, str) and final_formatted.strip().lower() == "free":
-                is_free_now = True
-
-            if not is_free_now:
-                return None
-
-            return {
-                "app_id": str(appid),
-                "title": d.get("name", f"App {appid}"),
-                "url": f"https://store.steampowered.com/app/{appid}",
-                "started_at": None,
-                "ends_at": None,
-            }
+                # Unavailable in this region; remember that like a static answer
+                e.update(success=False, static_fetched_at=now)
+            e["price_overview"] = d.get("price_overview")
+            e["price_fetched_at"] = now
+            cache[appid] = refreshed[appid] = e
+
+    async def fetch_static(appid: int):
+        async with sem:
+            try:
+                data = await fetch_json(session, appdetails_url([appid], "basic"))
+            except Exception:
+                static_failed.append(appid)
+                return
+        block = (data or {}).get(str(appid)) or {}
+        d = block.get("data")
+        if not isinstance(d, dict):
+            d = {}
+        e = dict(cache.get(appid) or {"price_overview": None, "price_fetched_at": 0})
+        e.update(
+            success=bool(block.get("success")),
+            type=d.get("type"),
+            name=d.get("name"),
+            static_fetched_at=now,
+        )
+        cache[appid] = refreshed[appid] = e
+
+    def flush_price_batches(final: bool = False):
+        while len(need_price) >= STEAM_APPDETAILS_BATCH or (final and need_price):
+            batch = need_price[:STEAM_APPDETAILS_BATCH]
+            del need_price[:STEAM_APPDETAILS_BATCH]
+            price_tasks.append(asyncio.create_task(fetch_price_batch(batch)))
+
+    async def accept_rows(rows: List[SteamSearchRow]):
+        """Feed newly seen appids into the price stage as soon as they arrive."""
+        nonlocal rows_seen
+        rows_seen += len(rows)
+        fresh = []
+        for row in rows:
+            verdict = steam_row_verdict(row)
+            for a in row.appids:
+                if a in seen_ids:
+                    continue
+                seen_ids.add(a)
+                if verdict is False:
+                    continue
+                appids.append(a)
+                fresh.append(a)
+                if verdict:
+                    row_free.add(a)
+                if row.title and not row.is_package:
+                    row_titles[a] = row.title
+        if not fresh:
+            return
+        cache.update(await steam_cache_load(fresh, region))
+        misses = [
+            a
+            for a in fresh
+            if a not in row_free
+            and not known_non_game(cache.get(a))
+            and not price_fresh(cache.get(a))
+        ]
+        METRICS.inc("steam_appdetails_cache_total", len(fresh) - len(misses), result="hit")
+        METRICS.inc("steam_appdetails_cache_total", len(misses), result="miss")
+        need_price.extend(misses)
+        flush_price_batches()
+
+    try:
+        # Without page 0 there's no total_count and no results: fail the fetch
+        # rather than report an empty Steam
+        first = await fetch_json(session, build_search_url(0), STEAM_SEARCH_KEYS)
+        rows = page_rows(first)
+        await accept_rows(rows)
+        total = int((first or {}).get("total_count") or 0)
+
+        # Stop if we've seen as many rows as reported, or a page returns none
+        if rows and rows_seen < total:
+            # Cap pages defensively
+            max_pages = 40
+            page_sem = asyncio.Semaphore(STEAM_SEARCH_CONCURRENCY)
+            done = False
+
+            async def fetch_page(start: int):
+                nonlocal done
+                async with page_sem:
+                    if done:
+                        return
+                    try:
+                        page = await fetch_json(session, build_search_url(start), STEAM_SEARCH_KEYS)
+                    except Exception as e:
+                        # Later pages are independent; keep going without this one
+                        print(f"[steam] search page {start} failed ({region}): {e}")
+                        failed_pages.append(start)
+                        return
+                    rows = page_rows(page)
+                    if not rows:
+                        done = True
+                        return
+                    await accept_rows(rows)
+                    if rows_seen >= total:
+                        done = True
+
+            last = min(total, max_pages * page_size)
+            await asyncio.gather(*(fetch_page(s) for s in range(page_size, last, page_size)))
+
+        # Fallback: if search returned nothing, try featured specials as a backup source
+        if not appids:
+            try:
+                featured_url = (
+                    f"{STEAM_STORE_BASE}/api/featuredcategories?cc={region}&l=en"
+                )
+                data = await fetch_json(session, featured_url)
+                specials = (data.get("specials") or {}).get("items", []) or []
+                await accept_rows(
+                    [
+                        SteamSearchRow((item["id"],), False, item.get("name") or "", None, None, None)
+                        for item in specials
+                        if isinstance(item.get("id"), int)
+                    ]
+                )
+            except Exception:
+                pass
+
+        flush_price_batches(final=True)
+        await asyncio.gather(*price_tasks)
+    finally:
+        for t in price_tasks:
+            t.cancel()
+
+    def price_says_free(a: int) -> bool:
+        e = cache.get(a)
+        # A failed price lookup falls back to the last cached price, however old
+        usable = price_fresh(e) or (a in price_failed and bool(e) and e["price_fetched_at"] > 0)
+        return usable and e["success"] and steam_price_is_free(e.get("price_overview"))
+
+    candidates = [
+        a
+        for a in appids
+        if not known_non_game(cache.get(a)) and (a in row_free or price_says_free(a))
+    ]
+    await asyncio.gather(
+        *(fetch_static(a) for a in candidates if not static_fresh(cache.get(a)))
+    )
+
+    unverified = [a for a in price_failed if not (cache.get(a) or {}).get("price_fetched_at")]
+    unverified += [a for a in static_failed if not (cache.get(a) or {}).get("static_fetched_at")]
+    if failed_pages or price_failed or static_failed:
+        METRICS.inc("steam_incomplete_total", len(failed_pages), region=region, stage="search")
+        METRICS.inc("steam_incomplete_total", len(unverified), region=region, stage="appdetails")
+        print(
+            f"[steam] {region}: {len(failed_pages)} search pages failed, "
+            f"{len(price_failed) + len(static_failed)} appdetails lookups failed "
+            f"({len(unverified)} apps with no cached answer to fall back on)"
+        )
+
+    results: List[Deal] = []
+    for appid in candidates:
+        e = cache.get(appid)
+        if not e or not e["success"] or e["type"] != "game":
+            continue
+        results.append(
+            Deal(
+                "steam",
+                region,
+                str(appid),
+                e.get("name") or row_titles.get(appid) or f"App {appid}",
+                f"https://store.steampowered.com/app/{appid}",
+            )
+        )
+
+    try:
+        await steam_cache_store(region, refreshed, appids)
+    except Exception as e:
+        print(f"[steam] appdetails cache write failed ({region}): {e}")
+
+    # Apps on failed pages, or with no answer at all, may still be free
+    return PartialDeals(results) if failed_pages or unverified else results
+
+
+# ----------------- Sources -----------------
+
+
+@dataclass(frozen=True)
+class Source:
+    """
+    A store plugin. `fetch(session, region)` scrapes the region's free deals
+    as Deals with platform == name (a PartialDeals when the fetch had holes);
+    fetch_source adds the timeout, normalization, validation and metrics, and
+    everything downstream (snapshots, storage, announcements, /freelist and
+    the scheduler) works off the SOURCES registry.
+    """
+
+    name: str
+    label: str  # "/freelist" titles and announcement footers
+    short: str  # single-deal announcement text
+    fetch: Callable[[aiohttp.ClientSession, str], Awaitable[List[Deal]]]
+    # Hosts the store is scraped from, and the request rate (per second) to
+    # keep to on each; None leaves them at HTTP_HOST_RATE. HTTP_HOST_RATES wins.
+    hosts: Tuple[str, ...] = ()
+    rate: Optional[float] = None
+    timeout: Optional[float] = None  # SOURCE_TIMEOUT_SECONDS when unset
+    # Store-specific rules on top of normalize_deal / deal_problem
+    normalize: Optional[Callable[[Deal], Deal]] = None
+    validate: Optional[Callable[[Deal], bool]] = None
+    # Scheduling hints: promos come in bursts (poll closer while some are
+    # live), and the next time the feed is known to change, if any
+    bursty: bool = False
+    next_change: Optional[Callable[[str, float], Awaitable[Optional[float]]]] = None
+    # Extra /freelist_debug detail for a region
+    debug: Optional[Callable[[aiohttp.ClientSession, str], Awaitable[str]]] = None
+
+
+# name -> Source, in registration order (which is also display order)
+SOURCES: Dict[str, Source] = {}
+
+
+def register_source(source: Source) -> Source:
+    SOURCES[source.name] = source
+    if source.rate is not None:
+        for host in source.hosts:
+            SOURCE_HOST_RATES[host] = source.rate
+            HOST_POLICIES.pop(host, None)
+    return source
+
+
+class SourceTimeout(asyncio.TimeoutError):
+    """A source's region fetch ran past its timeout."""
+
+
+def normalize_deal(d: Deal) -> Deal:
+    title = " ".join((d.title or "").split())
+    url = (d.url or "").strip()
+    if (title, url) == (d.title, d.url):
+        return d
+    return replace(d, title=title, url=url)
+
+
+def deal_problem(source: Source, region: str, d: Deal) -> Optional[str]:
+    """Why a fetched deal can't be used (a metric label), or None."""
+    if d.platform != source.name or d.region != region:
+        return "wrong_source"
+    if not d.app_id or not d.title:
+        return "missing_field"
+    if urlsplit(d.url).scheme not in ("http", "https"):
+        return "bad_url"
+    if d.starts_at and d.ends_at and d.ends_at <= d.starts_at:
+        return "bad_window"
+    if source.validate is not None and not source.validate(d):
+        return "rejected"
+    return None
+
+
+def validate_deals(source: Source, region: str, deals: List[Deal]) -> List[Deal]:
+    """Normalize fetched deals; drop unusable ones and repeated app_ids. Keeps PartialDeals."""
+    kept: List[Deal] = []
+    seen: Set[str] = set()
+    for d in deals:
+        d = normalize_deal(d)
+        if source.normalize is not None:
+            d = source.normalize(d)
+        problem = deal_problem(source, region, d)
+        if problem is None and d.app_id in seen:
+            problem = "duplicate"
+        if problem is not None:
+            METRICS.inc("source_rejected_deals_total", source=source.name, reason=problem)
+            continue
+        seen.add(d.app_id)
+        kept.append(d)
+    if len(kept) < len(deals):
+        print(f"[{source.name}] {region}: dropped {len(deals) - len(kept)} invalid deals")
+    return PartialDeals(kept) if isinstance(deals, PartialDeals) else kept
+
+
+async def fetch_source(
+    source: Source, session: aiohttp.ClientSession, region: str
+) -> List[Deal]:
+    """One source's validated deals for a region, within its timeout."""
+    seconds = SOURCE_TIMEOUTS.get(source.name, source.timeout or SOURCE_TIMEOUT_SECONDS)
+    deadline = asyncio.timeout(seconds)
+    try:
+        with METRICS.timer("fetch_seconds", source=source.name):
+            async with deadline:
+                deals = await source.fetch(session, region)
+    except Exception as e:
+        METRICS.inc("fetch_errors_total", source=source.name)
+        if isinstance(e, TimeoutError) and deadline.expired():
+            raise SourceTimeout(f"{source.name} {region} timed out after {seconds:g}s") from None
+        raise
+    deals = validate_deals(source, region, deals)
+    METRICS.set("deals_found", len(deals), source=source.name, region=region)
+    return deals
+
+
+async def fetch_sources(
+    region: str, names: Optional[List[str]] = None
+) -> Tuple[Dict[str, List[Deal]], Dict[str, Exception]]:
+    """
+    Fetch a region from several sources (default: all) concurrently, each
+    under its own timeout, so a slow store never holds up the others.
+    Returns ({source: deals} for the ones that worked, {source: error}).
+    """
+    names = list(names or SOURCES)
+    session = get_http_session()
+    got = await asyncio.gather(
+        *(fetch_source(SOURCES[n], session, region) for n in names), return_exceptions=True
+    )
+    results: Dict[str, List[Deal]] = {}
+    errors: Dict[str, Exception] = {}
+    for name, r in zip(names, got):
+        if isinstance(r, Exception):
+            errors[name] = r
+        elif isinstance(r, BaseException):
+            raise r
+        else:
+            results[name] = r
+    return results, errors
+
+
+async def epic_next_change(region: str, now: float) -> Optional[float]:
+    """
+    The weekly rollover, when new promos can appear. Known promo starts/ends
+    need no fetch: promo_boundary_watcher applies them from stored windows.
+    """
+    return next_epic_rollover(now)
 
-    tasks_list = [process_app(aid) for aid in appids]
-    processed = await asyncio.gather(*tasks_list)
-    for r in processed:
-        if r:
-            results.append(r)
 
-    # De-dup by app_id
-    uniq, seen = [], set()
-    for r in results:
-        if r["app_id"] not in seen:
-            seen.add(r["app_id"])
-            uniq.append(r)
-    return uniq
+async def epic_debug(session: aiohttp.ClientSession, region: str) -> str:
+    raw = await try_fetch_json(session, epic_feed_url(region), EPIC_FEED_KEYS)
+    elems = []
+    if isinstance(raw, dict):
+        elems = (
+            (raw.get("data", {}) or {})
+            .get("Catalog", {})
+            .get("searchStore", {})
+            .get("elements", [])
+        )
+    return f"feed elements: {len(elems)}"
+
+
+register_source(
+    Source(
+        name="epic",
+        label="Epic Games Store",
+        short="EGS",
+        fetch=get_epic_free_promos,
+        hosts=(urlsplit(EPIC_API_BASE).hostname,),
+        next_change=epic_next_change,
+        debug=epic_debug,
+    )
+)
+register_source(
+    Source(
+        name="steam",
+        label="Steam",
+        short="Steam",
+        fetch=get_steam_free_promos,
+        hosts=(urlsplit(STEAM_STORE_BASE).hostname,),
+        # A full search scrape plus appdetails lookups takes a while
+        timeout=300,
+        bursty=True,
+    )
+)
 
 
 # ----------------- Admin Utilities -----------------
 
 
+# (region, source) -> the fetch_source_shared call running in this process
+_shared_fetches: Dict[Tuple[str, str], asyncio.Task] = {}
+
+
+def _on_shared_fetch_done(key: Tuple[str, str], task: asyncio.Task):
+    if _shared_fetches.get(key) is task:
+        del _shared_fetches[key]
+    if not task.cancelled():
+        task.exception()  # every caller may have gone; don't warn about it unretrieved
+
+
+async def fetch_source_shared(
+    region: str, source: str, max_age: float
+) -> Optional[Tuple[List[Deal], float]]:
+    """
+    Get region/source deals, fetching at most once across all shard processes:
+    reuse a shared result younger than max_age, otherwise take the fetch lease,
+    fetch and publish. Returns (deals, fetched_at), or None when another
+    process holds the lease and nothing fresh is published yet. Callers in
+    this process (the scheduler, /freelist refreshes) share one call.
+    """
+    key = (region, source)
+    task = _shared_fetches.get(key)
+    if task is None:
+        task = asyncio.create_task(_fetch_source_shared(region, source, max_age))
+        _shared_fetches[key] = task
+        task.add_done_callback(lambda t: _on_shared_fetch_done(key, t))
+    else:
+        METRICS.inc("shared_results_total", source=source, result="joined")
+    # shield: a cancelled caller must not cancel the fetch other callers share
+    return await asyncio.shield(task)
+
+
+async def _renew_fetch_lease(region: str, source: str):
+    while True:
+        await asyncio.sleep(FETCH_LEASE_SECONDS / 3)
+        try:
+            if not await acquire_fetch_lease(region, source):
+                print(f"[lease] {source} {region}: lease lost to another process")
+                return
+        except Exception as e:
+            print(f"[lease] {source} {region}: renewal failed: {e}")
+
+
+async def _fetch_source_shared(
+    region: str, source: str, max_age: float
+) -> Optional[Tuple[List[Deal], float]]:
+    shared = await load_region_results(region, source)
+    if shared and time.time() - shared[1] < max_age:
+        METRICS.inc("shared_results_total", source=source, result="reused")
+        return shared
+    if not await acquire_fetch_lease(region, source):
+        METRICS.inc("shared_results_total", source=source, result="leased_elsewhere")
+        return None
+    try:
+        # The previous holder may have published just before we got the lease
+        shared = await load_region_results(region, source)
+        if shared and time.time() - shared[1] < max_age:
+            METRICS.inc("shared_results_total", source=source, result="reused")
+            return shared
+        METRICS.inc("shared_results_total", source=source, result="fetched")
+        # A fetch may outlive FETCH_LEASE_SECONDS (Steam's timeout alone is 300 s)
+        renewal = asyncio.create_task(_renew_fetch_lease(region, source))
+        try:
+            deals = await fetch_source(SOURCES[source], get_http_session(), region)
+        finally:
+            renewal.cancel()
+        fetched_at = time.time()
+        await publish_region_results(region, source, deals, fetched_at)
+        return deals, fetched_at
+    finally:
+        await release_fetch_lease(region, source)
+
+
+# (region, platform) -> (fingerprint of the deals last written to the deals
+# table, when). An unchanged result is written again after
+# DEAL_LAST_SEEN_REFRESH only, to keep last_seen roughly current.
+_stored_results: Dict[Tuple[str, str], Tuple[int, float]] = {}
+DEAL_LAST_SEEN_REFRESH = 3600
+
+
+def deals_fingerprint(deals: List[Deal]) -> int:
+    return hash(frozenset(deals))
+
+
+async def store_region_deals(
+    region: str, results: Dict[str, List[Deal]]
+) -> Optional[DealChanges]:
+    """
+    Apply a region's results ({platform: deals}) to the DB. Platforms whose
+    deals are identical to what this process last stored (within the last
+    DEAL_LAST_SEEN_REFRESH) are skipped, so an unchanged feed costs no DB
+    work; returns None when nothing was applied, and an empty (falsy)
+    DealChanges when only last_seen was refreshed.
+    """
+    now = time.time()
+    fps = {p: deals_fingerprint(deals) for p, deals in results.items()}
+    changed = {}
+    for p in results:
+        fp, stored_at = _stored_results.get((region, p), (None, 0.0))
+        if fp != fps[p] or now - stored_at >= DEAL_LAST_SEEN_REFRESH:
+            changed[p] = results[p]
+    if not changed:
+        return None
+    changes = await apply_region_deals(region, changed)
+    for p in changed:
+        _stored_results[(region, p)] = (fps[p], now)
+    return changes
+
+
+# ----------------- Region Snapshots -----------------
+
+# region -> {source: [deals], ..., "fetched": {source: unix seconds},
+#            "fetched_at": unix seconds of the oldest source,
+#            "version": changes whenever the region's deal set changes}
+REGION_SNAPSHOTS: Dict[str, Dict] = {}
+_snapshot_refreshes: Dict[str, asyncio.Task] = {}
+_snapshot_versions = itertools.count(1)
+
+
+def snapshot_version(prev: Optional[Dict], deals: Dict[str, List[Deal]]) -> int:
+    """Keep prev's version unless one of `deals` ({source: deals}) differs from it."""
+    if prev is None or any(set(prev.get(s, ())) != set(d) for s, d in deals.items()):
+        return next(_snapshot_versions)
+    return prev["version"]
+
+
+def expire_snapshot_deals(region: str, now: int) -> Optional[Dict]:
+    """Drop deals past their end time from a region snapshot (a new version if any went)."""
+    snap = REGION_SNAPSHOTS.get(region)
+    if snap is None:
+        return None
+    live = {s: [d for d in snap.get(s, ()) if deal_live(d, now)] for s in SOURCES}
+    if all(len(live[s]) == len(snap.get(s, ())) for s in SOURCES):
+        return snap
+    snap = {**snap, **live, "version": next(_snapshot_versions)}
+    REGION_SNAPSHOTS[region] = snap
+    return snap
+
+
+def update_snapshot_source(
+    region: str, source: str, deals: List[Deal], fetched_at: Optional[float] = None
+) -> Dict:
+    """Replace one source's deals in a region snapshot (the scheduler polls sources apart)."""
+    prev = REGION_SNAPSHOTS.get(region)
+    base = prev or {**{s: [] for s in SOURCES}, "fetched": {}}
+    fetched = {**base["fetched"], source: fetched_at or time.time()}
+    snap = {
+        **base,
+        source: deals,
+        "fetched": fetched,
+        "fetched_at": min(fetched.values()),
+        "version": snapshot_version(prev, {source: deals}),
+    }
+    REGION_SNAPSHOTS[region] = snap
+    return snap
+
+
+def snapshot_complete(snap: Optional[Dict]) -> bool:
+    return snap is not None and all(s in snap["fetched"] for s in SOURCES)
+
+
+def snapshot_missing(snap: Dict) -> List[str]:
+    """Labels of the sources the snapshot has no result from yet."""
+    return [src.label for name, src in SOURCES.items() if name not in snap["fetched"]]
+
+
+def snapshot_age(snap: Dict) -> float:
+    return max(0.0, time.time() - snap["fetched_at"])
+
+
+async def _refresh_snapshot_source(region: str, source: str):
+    got = await fetch_source_shared(region, source, SNAPSHOT_MAX_AGE)
+    if got is None:
+        # Another process is fetching it right now; serve its last result
+        got = await load_region_results(region, source)
+    if got is None:
+        raise RuntimeError(f"{source} results for {region} are not available yet")
+    # Into the snapshot as soon as it's here, without waiting for slower sources
+    update_snapshot_source(region, source, *got)
+
+
+async def _refresh_region_snapshot(region: str) -> Dict:
+    got = await asyncio.gather(
+        *(_refresh_snapshot_source(region, s) for s in SOURCES), return_exceptions=True
+    )
+    snap = REGION_SNAPSHOTS.get(region)
+    errors = [r for r in got if isinstance(r, BaseException)]
+    if errors and (snap is None or not snap["fetched"]):
+        raise errors[0]
+    for e in errors:
+        # That source keeps its previous result, or shows as missing
+        print(f"[snapshot] region {region} refresh error: {e}")
+    return snap
+
+
+def _on_snapshot_refresh_done(region: str, task: asyncio.Task):
+    _snapshot_refreshes.pop(region, None)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"[snapshot] region {region} refresh error: {task.exception()}")
+
+
+def start_snapshot_refresh(region: str) -> asyncio.Task:
+    """Start a refresh for region, or join the one already running."""
+    task = _snapshot_refreshes.get(region)
+    if task is None:
+        task = asyncio.create_task(_refresh_region_snapshot(region))
+        _snapshot_refreshes[region] = task
+        task.add_done_callback(lambda t: _on_snapshot_refresh_done(region, t))
+    return task
+
+
+async def refresh_region_snapshot(region: str, timeout: Optional[float] = None) -> Optional[Dict]:
+    """Refresh region (or join the running refresh); after `timeout`, the snapshot so far."""
+    try:
+        # shield: a cancelled caller must not cancel the refresh other callers share
+        return await asyncio.wait_for(asyncio.shield(start_snapshot_refresh(region)), timeout)
+    except asyncio.TimeoutError:
+        return REGION_SNAPSHOTS.get(region)
+
+
+def format_age(seconds: float) -> str:
+    if seconds < 60:
+        return "just now"
+    minutes = int(seconds // 60)
+    if minutes < 60:
+        return f"{minutes} min ago"
+    return f"{minutes // 60} h {minutes % 60} min ago"
+
+
 async def poll_once_for_guild(guild: discord.Guild):
-    settings = await get_guild_settings(guild.id)
+    settings = get_guild_settings(guild.id)
     region = settings.get("region", "US")
     channel_id = settings.get("channel_id")
     if not channel_id:
@@ -416,81 +2450,299 @@ async def poll_once_for_guild(guild: discord.Guild):
     if channel is None:
         return {"error": "Configured channel not found."}
 
-    async with aiohttp.ClientSession(headers={"User-Agent": "freewatch/1.0"}) as session:
-        epic = await get_epic_free_promos(session, region)
-        steam = await get_steam_free_promos(session, region)
-
-    new_epic, new_steam = [], []
-    for d in epic:
-        exists = await deal_exists("epic", d["app_id"], region)
-        await upsert_deal(
-            "epic",
-            d["app_id"],
-            region,
-            d["title"],
-            d["url"],
-            d.get("started_at"),
-            d.get("ends_at"),
-        )
-        if not exists:
-            new_epic.append(d)
-    for d in steam:
-        exists = await deal_exists("steam", d["app_id"], region)
-        await upsert_deal(
-            "steam",
-            d["app_id"],
-            region,
-            d["title"],
-            d["url"],
-            d.get("started_at"),
-            d.get("ends_at"),
-        )
-        if not exists:
-            new_steam.append(d)
+    results, errors = await fetch_sources(region)
+    for source, deals in results.items():
+        update_snapshot_source(region, source, deals)
 
-    await announce_new_deals(channel, new_epic, new_steam)
+    await store_region_deals(region, results)
+    queued = await announce_region_deals(region, [channel], results)
     return {
         "region": region,
-        "found_epic": len(epic),
-        "found_steam": len(steam),
-        "announced_epic": len(new_epic),
-        "announced_steam": len(new_steam),
+        "found": {s: len(deals) for s, deals in results.items()},
+        "announced": queued.get(guild.id, {}),
+        "errors": {s: str(e) or type(e).__name__ for s, e in errors.items()},
     }
 
 
 # ----------------- Discord Embeds -----------------
 
 
-def epic_embed_item(d: Dict):
-    ends = (
-        f"Ends: <t:{int(dtparse.isoparse(d['ends_at']).timestamp())}:R>"
-        if d.get("ends_at")
-        else "Ends: unknown"
-    )
-    e = discord.Embed(title=d["title"], url=d["url"], description=ends)
-    e.set_footer(text="Epic Games Store • $0.00")
+def deal_embed_item(d: Deal):
+    ends = f"Ends: <t:{d.ends_at}:R>" if d.ends_at else "Ends: unknown"
+    e = discord.Embed(title=d.title, url=d.url, description=ends)
+    e.set_footer(text=f"{SOURCES[d.platform].label} • $0.00")
     return e
 
 
-def steam_embed_item(d: Dict):
-    e = discord.Embed(title=d["title"], url=d["url"], description="Ends: unknown")
-    e.set_footer(text="Steam • $0.00")
-    return e
+# Discord allows at most 10 embeds per message
+EMBEDS_PER_MESSAGE = 10
 
 
-async def announce_new_deals(
-    channel: discord.TextChannel, new_epic: List[Dict], new_steam: List[Dict]
-):
-    if not new_epic and not new_steam:
-        return
-    for d in new_epic:
-        await channel.send(
-            content="🎁 **New free game (EGS)**", embed=epic_embed_item(d)
-        )
-    for d in new_steam:
-        await channel.send(
-            content="🎁 **New free game (Steam)**", embed=steam_embed_item(d)
-        )
+def build_announcements(new: List[Deal]) -> List[Tuple[str, List[discord.Embed], List[Deal]]]:
+    """Pack new deals into messages of up to 10 embeds: (content, embeds, deals)."""
+    items = [(d, deal_embed_item(d)) for d in new]
+    messages = []
+    for i in range(0, len(items), EMBEDS_PER_MESSAGE):
+        chunk = items[i : i + EMBEDS_PER_MESSAGE]
+        if len(chunk) == 1:
+            content = f"🎁 **New free game ({SOURCES[chunk[0][0].platform].short})**"
+        else:
+            content = f"🎁 **{len(chunk)} new free games**"
+        messages.append((content, [e for _, e in chunk], [d for d, _ in chunk]))
+    return messages
+
+
+# Discord limits: characters per embed description, and embed text per message
+EMBED_DESCRIPTION_LIMIT = 4096
+MESSAGE_EMBED_CHARS = 6000
+
+
+def paged_list_embeds(title: str, lines: List[str]) -> List[discord.Embed]:
+    """Split list lines over as many embeds as the description limit needs."""
+    chunks: List[List[str]] = []
+    size = EMBED_DESCRIPTION_LIMIT
+    for line in lines:
+        line = line[:EMBED_DESCRIPTION_LIMIT]
+        if size + len(line) > EMBED_DESCRIPTION_LIMIT:
+            chunks.append([])
+            size = 0
+        chunks[-1].append(line)
+        size += len(line)
+    n = len(chunks)
+    return [
+        discord.Embed(title=title if n == 1 else f"{title} ({i}/{n})", description="".join(c))
+        for i, c in enumerate(chunks, 1)
+    ]
+
+
+def pack_embed_messages(embeds: List[discord.Embed]) -> List[List[discord.Embed]]:
+    """Group embeds into messages of at most 10 embeds / 6000 characters."""
+    messages: List[List[discord.Embed]] = []
+    chars = MESSAGE_EMBED_CHARS
+    for e in embeds:
+        if chars + len(e) > MESSAGE_EMBED_CHARS or len(messages[-1]) == EMBEDS_PER_MESSAGE:
+            messages.append([])
+            chars = 0
+        messages[-1].append(e)
+        chars += len(e)
+    return messages
+
+
+def render_freelist(region: str, snap: Dict) -> List[List[discord.Embed]]:
+    embeds: List[discord.Embed] = []
+    for name, source in SOURCES.items():
+        deals = sorted(snap.get(name, ()), key=lambda d: d.title or "")
+        if deals:
+            embeds += paged_list_embeds(
+                f"{source.label} — Free Right Now ({region})",
+                [
+                    f"• [{d.title}]({d.url}) • "
+                    + (f"Ends <t:{d.ends_at}:R>" if d.ends_at else "Ends unknown")
+                    + "\n"
+                    for d in deals
+                ],
+            )
+    return pack_embed_messages(embeds)
+
+
+# region -> (snapshot version, rendered /freelist messages). The embeds
+# are shared between calls and never mutated; a new deal set gets a new
+# snapshot version, which is what invalidates an entry.
+_freelist_renders: Dict[str, Tuple[int, List[List[discord.Embed]]]] = {}
+
+
+def freelist_messages(region: str, snap: Dict) -> List[List[discord.Embed]]:
+    cached = _freelist_renders.get(region)
+    if cached is not None and cached[0] == snap["version"]:
+        METRICS.inc("freelist_render_total", result="hit")
+        return cached[1]
+    METRICS.inc("freelist_render_total", result="miss")
+    messages = render_freelist(region, snap)
+    _freelist_renders[region] = (snap["version"], messages)
+    return messages
+
+
+@dataclass
+class AnnouncementJob:
+    region: str
+    channel: discord.TextChannel
+    content: str
+    embeds: List[discord.Embed]
+    deals: List[Deal]
+
+
+class AnnouncementDispatcher:
+    """
+    Delivers announcements off the poll path. Messages are queued per channel
+    and a pool of workers drains channels independently: one channel's sends
+    stay ordered and serialized (Discord buckets message sends per channel),
+    while a slow or rate-limited channel never holds up the others.
+    Delivered deals are written to the ledger in batches by a flusher task,
+    at most every ANNOUNCE_LEDGER_FLUSH_SECONDS; until then they stay in
+    _queued so the next poll doesn't announce them again.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = max(1, workers)
+        self._ready: "asyncio.Queue[int]" = asyncio.Queue()
+        self._pending: Dict[int, Deque[AnnouncementJob]] = {}
+        # (guild_id, platform, app_id) queued but not yet delivered
+        self._queued: Set[Tuple[int, str, str]] = set()
+        self._tasks: List[asyncio.Task] = []
+        # (region, guild_id, deal) delivered but not yet in the ledger (not
+        # flushed yet, or the write failed); kept in _queued until recorded
+        self._unrecorded: List[Tuple[str, int, Deal]] = []
+        self._flush_wanted = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+        self.stats = {"sent": 0, "failed": 0, "retried": 0}
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        tasks = self._tasks + ([self._flusher] if self._flusher else [])
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks, self._flusher = [], None
+        await self.flush_ledger()
+
+    def is_queued(self, guild_id: int, platform: str, app_id: str) -> bool:
+        return (guild_id, platform, app_id) in self._queued
+
+    def backlog(self) -> int:
+        return sum(len(q) for q in self._pending.values())
+
+    def submit(self, region: str, channel: discord.TextChannel, new: List[Deal]) -> int:
+        """Queue new deals for a channel; returns the number of messages queued."""
+        messages = build_announcements(new)
+        if not messages:
+            return 0
+        queue = self._pending.get(channel.id)
+        if queue is None:
+            queue = self._pending[channel.id] = deque()
+            self._ready.put_nowait(channel.id)
+        for content, embeds, deals in messages:
+            queue.append(AnnouncementJob(region, channel, content, embeds, deals))
+            self._queued.update((channel.guild.id, d.platform, d.app_id) for d in deals)
+        return len(messages)
+
+    async def _worker(self):
+        while True:
+            channel_id = await self._ready.get()
+            try:
+                queue = self._pending.get(channel_id)
+                while queue:
+                    job = queue.popleft()
+                    try:
+                        await self._deliver(job)
+                    except Exception as e:
+                        print(f"[announce] channel {channel_id} error: {e}")
+            finally:
+                # Only non-empty when the worker is cancelled: release what's dropped
+                for job in self._pending.pop(channel_id, ()):
+                    self._queued.difference_update(
+                        (job.channel.guild.id, d.platform, d.app_id) for d in job.deals
+                    )
+                self._ready.task_done()
+
+    async def _flush_loop(self):
+        while True:
+            await self._flush_wanted.wait()
+            # Let deliveries pile up so a burst costs one ledger write
+            await asyncio.sleep(ANNOUNCE_LEDGER_FLUSH_SECONDS)
+            self._flush_wanted.clear()
+            if not await self.flush_ledger():
+                self._flush_wanted.set()
+
+    async def flush_ledger(self) -> bool:
+        """Write delivered deals to the ledger; a failed write is kept for the next call."""
+        if not self._unrecorded:
+            return True
+        pending, self._unrecorded = self._unrecorded, []
+        try:
+            await record_announcements(pending)
+        except Exception as e:
+            self._unrecorded = pending + self._unrecorded
+            METRICS.inc("announcements_total", result="unrecorded")
+            print(f"[announce] ledger write failed, {len(pending)} deliveries kept for retry: {e}")
+            return False
+        self._queued.difference_update((gid, d.platform, d.app_id) for _, gid, d in pending)
+        return True
+
+    async def _deliver(self, job: AnnouncementJob):
+        gid = job.channel.guild.id
+        delivered = False
+        try:
+            for attempt in range(ANNOUNCE_MAX_RETRIES + 1):
+                try:
+                    await job.channel.send(content=job.content, embeds=job.embeds)
+                except (discord.Forbidden, discord.NotFound) as e:
+                    print(f"[announce] guild {gid} channel {job.channel.id}: {e}")
+                    break
+                except discord.HTTPException as e:
+                    if e.status != 429 and e.status < 500:
+                        print(f"[announce] guild {gid} channel {job.channel.id}: {e}")
+                        break
+                    retry_after = e.response.headers.get("Retry-After") if e.response else None
+                    delay = float(retry_after) if retry_after else 2**attempt
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    delay = 2**attempt
+                else:
+                    self.stats["sent"] += 1
+                    METRICS.inc("announcements_total", result="sent")
+                    # flush_ledger releases the deals from _queued once they're recorded
+                    delivered = True
+                    self._unrecorded.extend((job.region, gid, d) for d in job.deals)
+                    self._flush_wanted.set()
+                    return
+                if attempt < ANNOUNCE_MAX_RETRIES:
+                    self.stats["retried"] += 1
+                    METRICS.inc("announcements_total", result="retried")
+                    await asyncio.sleep(min(delay, 60.0) + random.uniform(0, 1))
+            self.stats["failed"] += 1
+            METRICS.inc("announcements_total", result="failed")
+        finally:
+            if not delivered:
+                self._queued.difference_update((gid, d.platform, d.app_id) for d in job.deals)
+
+
+DISPATCHER = AnnouncementDispatcher(ANNOUNCE_WORKERS)
+METRICS.collectors.append(lambda: METRICS.set("announce_backlog", DISPATCHER.backlog()))
+
+
+@METRICS.timed("announce_seconds")
+async def announce_region_deals(
+    region: str, channels: List[discord.TextChannel], current: Dict[str, List[Deal]]
+) -> Dict[int, Dict[str, int]]:
+    """
+    Queue every current deal a guild hasn't been told about yet (per the
+    ledger, or already waiting in the dispatcher), so guilds sharing a region
+    each get their announcements. Returns {guild_id: {platform: count}} queued.
+    """
+    if not any(current.values()):
+        return {}
+    announced = await get_announced(region)
+    queued: Dict[int, Dict[str, int]] = {}
+    for channel in channels:
+        gid = channel.guild.id
+        done = announced.get(gid, set())
+        pending = {
+            p: [
+                d
+                for d in deals
+                if d.key not in done and not DISPATCHER.is_queued(gid, p, d.app_id)
+            ]
+            for p, deals in current.items()
+        }
+        if not any(pending.values()):
+            continue
+        DISPATCHER.submit(region, channel, [d for deals in pending.values() for d in deals])
+        queued[gid] = {p: len(deals) for p, deals in pending.items()}
+    return queued
 
 
 # ----------------- Permissions Helpers -----------------
@@ -516,61 +2768,279 @@ async def ensure_owner_admin(interaction: discord.Interaction):
 # ----------------- Poller -----------------
 
 
-@tasks.loop(minutes=POLL_MINUTES)
-async def poll_deals():
-    async with aiohttp.ClientSession(headers={"User-Agent": "freewatch/1.0"}) as session:
-        for guild in BOT.guilds:
-            try:
-                settings = await get_guild_settings(guild.id)
-                region = settings.get("region", "US")
-                channel_id = settings.get("channel_id")
-                if not channel_id:
+def plan_region_fetches(
+    guilds: List[discord.Guild], settings_map: Dict[int, Dict]
+) -> Dict[str, List[discord.TextChannel]]:
+    """
+    Group announce targets by region so each region is fetched once per cycle.
+    Guilds without a (resolvable) announcement channel are left out.
+    """
+    plan: Dict[str, List[discord.TextChannel]] = {}
+    for guild in guilds:
+        settings = settings_map.get(guild.id)
+        if settings is None:
+            continue
+        channel_id = settings.get("channel_id")
+        if not channel_id:
+            continue
+        channel = guild.get_channel(channel_id)
+        if channel is None:
+            continue
+        plan.setdefault(settings.get("region") or "US", []).append(channel)
+    return plan
+
+
+def next_epic_rollover(now: float) -> float:
+    """Epic rotates its weekly freebies on Thursdays, 15:00 UTC (16:00 in northern winter)."""
+    dt = datetime.fromtimestamp(now, timezone.utc).replace(hour=15, minute=0, second=0, microsecond=0)
+    days = (3 - dt.weekday()) % 7
+    t = dt.timestamp() + days * 86400
+    # Still inside this week's rollover hour counts as "now"
+    return t if t + 3600 >= now else t + 7 * 86400
+
+
+class PollScheduler:
+    """
+    Event-driven poller: a min-heap of (due_at, source, region) jobs, one per
+    store per region that has announce targets. Each job computes its own
+    next run after it finishes, so frequency adapts per feed; the runner just
+    sleeps until the earliest due job (or until woken by a settings change).
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, str, str]] = []
+        # authoritative due time per job; heap entries that disagree are stale
+        self._due: Dict[Tuple[str, str], float] = {}
+        self._interval: Dict[Tuple[str, str], float] = {}
+        self._running: Set[Tuple[str, str]] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._regions: Dict[str, List[discord.TextChannel]] = {}
+        self._wake = asyncio.Event()
+        self._next_sync = 0.0
+
+    def channels(self, region: str) -> List[discord.TextChannel]:
+        return self._regions.get(region, [])
+
+    def schedule(self, source: str, region: str, due_at: float):
+        key = (source, region)
+        self._due[key] = due_at
+        heapq.heappush(self._heap, (due_at, source, region))
+        self._wake.set()
+
+    def request_sync(self):
+        """Re-read guild settings on the next tick (region/channel changed)."""
+        self._next_sync = 0.0
+        self._wake.set()
+
+    def next_runs(self, region: str) -> Dict[str, Tuple[Optional[float], float]]:
+        """{source: (next run unix time or None while running, interval seconds)}"""
+        base = POLL_MINUTES * 60
+        return {
+            s: (self._due.get((s, region)), self._interval.get((s, region), base))
+            for s in SOURCES
+        }
+
+    def _sync_regions(self):
+        self._regions = plan_region_fetches(BOT.guilds, GUILD_SETTINGS)
+        now = time.time()
+        base = POLL_MINUTES * 60
+        for region in self._regions:
+            snap = REGION_SNAPSHOTS.get(region) or {"fetched": {}}
+            for source in SOURCES:
+                key = (source, region)
+                if key in self._due or key in self._running:
                     continue
-                channel = guild.get_channel(channel_id)
-                if channel is None:
+                fetched = snap["fetched"].get(source)
+                if fetched is None:
+                    # Never fetched: run soon, staggered so a burst of regions doesn't align
+                    due = now + random.uniform(0, 30)
+                elif fetched + base > now:
+                    # Warm from the last run and still fresh: resume its cadence
+                    due = fetched + base
+                else:
+                    # Stale but servable: spread the catch-up over the first cycle
+                    # instead of hitting the stores in one burst
+                    due = now + random.uniform(0, base)
+                self.schedule(source, region, due)
+        for key in [k for k in self._due if k[1] not in self._regions]:
+            del self._due[key]
+
+    async def run(self):
+        await BOT.wait_until_ready()
+        sem = asyncio.Semaphore(REGION_FETCH_CONCURRENCY)
+        while True:
+            now = time.time()
+            if now >= self._next_sync:
+                try:
+                    self._sync_regions()
+                except Exception as e:
+                    print(f"[poll] region sync error: {e}")
+                self._next_sync = now + 60
+            while self._heap and self._heap[0][0] <= now:
+                due, source, region = heapq.heappop(self._heap)
+                key = (source, region)
+                if self._due.get(key) != due:
                     continue
+                del self._due[key]
+                self._running.add(key)
+                task = asyncio.create_task(self._run_job(sem, source, region))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            wait = self._next_sync - now
+            if self._heap:
+                wait = min(wait, self._heap[0][0] - now)
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=max(0.0, wait))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run_job(self, sem: asyncio.Semaphore, source: str, region: str):
+        ok, changed, found = False, False, 0
+        key = (source, region)
+        started = time.perf_counter()
+        try:
+            # A result another shard published within (most of) this job's
+            # interval is as good as fetching it ourselves
+            max_age = self._interval.get(key, POLL_MINUTES * 60) * (1 - POLL_JITTER)
+            async with sem:
+                got = await fetch_source_shared(region, source, max_age)
+            if got is None:
+                # Another shard is fetching it; pick its result up shortly
+                self._running.discard(key)
+                if region in self._regions:
+                    self.schedule(source, region, time.time() + 30 + random.uniform(0, 30))
+                return
+            deals, fetched_at = got
+            ok, found = True, len(deals)
+            update_snapshot_source(region, source, deals, fetched_at)
+            changed = bool(await store_region_deals(region, {source: deals}))
+            await announce_region_deals(region, self.channels(region), {source: deals})
+        except Exception as e:
+            print(f"[poll] {source} {region} error: {e}")
+        finally:
+            self._running.discard((source, region))
+        METRICS.observe("poll_job_seconds", time.perf_counter() - started, source=source)
+        METRICS.inc("poll_jobs_total", source=source, result="ok" if ok else "error")
+        if region in self._regions:
+            try:
+                due = await self._next_due(source, region, ok, changed, found)
+            except Exception as e:
+                print(f"[poll] {source} {region} scheduling error: {e}")
+                due = time.time() + POLL_MINUTES * 60
+            self.schedule(source, region, due)
+
+    async def _next_due(
+        self, source: str, region: str, ok: bool, changed: bool, found: int
+    ) -> float:
+        now = time.time()
+        base, lo, hi = POLL_MINUTES * 60, POLL_MIN_MINUTES * 60, POLL_MAX_MINUTES * 60
+        key = (source, region)
+        prev = self._interval.get(key, base)
+        if not ok or changed:
+            interval = base
+        else:
+            # Nothing moved: back off gradually
+            interval = min(hi, prev * 1.5)
+        src = SOURCES[source]
+        if src.bursty and found:
+            # Promos come in bursts; keep a closer eye while some are live
+            interval = min(interval, max(lo, base / 2))
+        hot = await src.next_change(region, now) if src.next_change is not None else None
+        if hot is not None:
+            if hot <= now + lo:
+                interval = lo
+            elif hot < now + interval:
+                # Land just after the rollover/promo boundary instead of polling past it
+                interval = max(lo, hot - now + 60)
+        interval = max(lo, interval)
+        self._interval[key] = interval
+        return now + interval * (1 + random.uniform(-POLL_JITTER, POLL_JITTER))
+
+
+SCHEDULER = PollScheduler()
+
+
+async def apply_epic_boundary(region: str, now: int):
+    """
+    An Epic promo started or ended in `region`: recompute its active Epic
+    deals from the stored windows and store/announce them without fetching.
+    """
+    epic = await get_active_epic_deals(region, now)
+    snap = REGION_SNAPSHOTS.get(region)
+    if snap is not None:
+        # Keep the fetch times: the Epic half changed, but not from a fetch
+        REGION_SNAPSHOTS[region] = {
+            **snap,
+            "epic": epic,
+            "version": snapshot_version(snap, {"epic": epic}),
+        }
+    await store_region_deals(region, {"epic": epic})
+    await announce_region_deals(region, SCHEDULER.channels(region), {"epic": epic})
 
-                epic = await get_epic_free_promos(session, region)
-                steam = await get_steam_free_promos(session, region)
-
-                new_epic, new_steam = [], []
-                for d in epic:
-                    exists = await deal_exists("epic", d["app_id"], region)
-                    await upsert_deal(
-                        "epic",
-                        d["app_id"],
-                        region,
-                        d["title"],
-                        d["url"],
-                        d.get("started_at"),
-                        d.get("ends_at"),
-                    )
-                    if not exists:
-                        new_epic.append(d)
-                for d in steam:
-                    exists = await deal_exists("steam", d["app_id"], region)
-                    await upsert_deal(
-                        "steam",
-                        d["app_id"],
-                        region,
-                        d["title"],
-                        d["url"],
-                        d.get("started_at"),
-                        d.get("ends_at"),
-                    )
-                    if not exists:
-                        new_steam.append(d)
 
-                await announce_new_deals(channel, new_epic, new_steam)
+async def promo_boundary_watcher():
+    """Sleep until the next stored Epic promo start/end, then apply it."""
+    await BOT.wait_until_ready()
+    last = int(time.time())
+    while True:
+        epic_windows_changed.clear()
+        nxt = await next_epic_boundary(last)
+        # Re-check at least hourly; new windows re-arm the wait immediately
+        timeout = 3600.0 if nxt is None else min(3600.0, max(0.0, nxt - time.time()) + 0.5)
+        try:
+            await asyncio.wait_for(epic_windows_changed.wait(), timeout=timeout)
+            continue
+        except asyncio.TimeoutError:
+            pass
+        now = int(time.time())
+        for region in await epic_regions_crossing(last, now):
+            try:
+                await apply_epic_boundary(region, now)
             except Exception as e:
-                # Keep polling other guilds even if one fails
-                print(f"[poll] guild {guild.id} error: {e}")
+                print(f"[promo] region {region} boundary error: {e}")
+        last = now
+
+
+_promo_watcher: Optional[asyncio.Task] = None
+_scheduler_task: Optional[asyncio.Task] = None
+
+
+@tasks.loop(minutes=DEAL_SWEEP_MINUTES)
+async def sweep_deals():
+    try:
+        now = int(time.time())
+        ended, removed = await sweep_expired_deals(now)
+        for region in list(REGION_SNAPSHOTS):
+            expire_snapshot_deals(region, now)
+        action = "archived" if ARCHIVE_ENDED_DEALS else "deleted"
+        METRICS.inc("deals_swept_total", ended, action="ended")
+        METRICS.inc("deals_swept_total", removed, action=action)
+        if ended or removed:
+            print(f"[sweep] {ended} deals ended, {removed} {action}")
+    except Exception as e:
+        print(f"[sweep] error: {e}")
 
 
-@poll_deals.before_loop
-async def before_poll():
+@sweep_deals.before_loop
+async def before_sweep():
+    await BOT.wait_until_ready()
+
+
+@tasks.loop(hours=6)
+async def prune_ledger():
+    try:
+        await DISPATCHER.flush_ledger()
+        removed = await prune_announcements()
+        if removed:
+            print(f"[prune] removed {removed} announcement ledger rows")
+    except Exception as e:
+        print(f"[prune] error: {e}")
+
+
+@prune_ledger.before_loop
+async def before_prune():
     await BOT.wait_until_ready()
-    await init_db()
 
 
 # ----------------- Slash Commands -----------------
@@ -585,56 +3055,55 @@ async def freelist(interaction: discord.Interaction):
         await interaction.response.send_message("Use this in a server.", ephemeral=True)
         return
 
-    settings = await get_guild_settings(interaction.guild.id)
+    settings = get_guild_settings(interaction.guild.id)
     region = settings["region"]
 
-    # Refresh latest for this guild's region
-    async with aiohttp.ClientSession(headers={"User-Agent": "freewatch/1.0"}) as session:
-        epic = await get_epic_free_promos(session, region)
-        steam = await get_steam_free_promos(session, region)
-
-    # Save so /freelist also updates DB
-    for d in epic:
-        await upsert_deal(
-            "epic", d["app_id"], region, d["title"], d["url"], d.get("started_at"), d.get("ends_at")
-        )
-    for d in steam:
-        await upsert_deal(
-            "steam", d["app_id"], region, d["title"], d["url"], d.get("started_at"), d.get("ends_at")
-        )
-
-    deals = await get_all_deals_for_region(region)
-    epic_list = [d for d in deals if d["platform"] == "epic"]
-    steam_list = [d for d in deals if d["platform"] == "steam"]
-
-    if not epic_list and not steam_list:
-        await interaction.response.send_message(
-            f"No free paid games found in **{region}** right now.", ephemeral=True
+    # Answer from the poller's snapshot; only a region nobody has fetched yet
+    # has to wait for a live scrape, and then only up to FREELIST_COLD_WAIT.
+    # Stale or partial snapshots refresh in the background.
+    snap = REGION_SNAPSHOTS.get(region)
+    if snap is None or not snap["fetched"]:
+        METRICS.inc("snapshot_requests_total", result="cold")
+        await interaction.response.defer()
+        send = interaction.followup.send
+        try:
+            snap = await refresh_region_snapshot(region, FREELIST_COLD_WAIT)
+        except Exception as e:
+            print(f"[freelist] region {region} fetch error: {e}")
+            snap = REGION_SNAPSHOTS.get(region)
+        if snap is None or not snap["fetched"]:
+            await send(f"❌ Couldn't fetch deals for **{region}** right now. Try again shortly.")
+            return
+    else:
+        send = interaction.response.send_message
+        if not snapshot_complete(snap):
+            METRICS.inc("snapshot_requests_total", result="partial")
+            start_snapshot_refresh(region)
+        elif snapshot_age(snap) > SNAPSHOT_MAX_AGE:
+            METRICS.inc("snapshot_requests_total", result="stale")
+            start_snapshot_refresh(region)
+        else:
+            METRICS.inc("snapshot_requests_total", result="fresh")
+
+    # Promos can end between polls; never list one past its end time
+    snap = expire_snapshot_deals(region, int(time.time())) or snap
+    missing = snapshot_missing(snap)
+    pending = f"\n⏳ Not loaded yet: {', '.join(missing)}" if missing else ""
+    if not any(snap.get(s) for s in SOURCES):
+        await send(
+            f"No free paid games found in **{region}** right now "
+            f"(checked {format_age(snapshot_age(snap))}).{pending}",
+            ephemeral=True,
         )
         return
 
-    embeds = []
-    if epic_list:
-        e = discord.Embed(
-            title=f"Epic Games Store — Free Right Now ({region})", description=""
-        )
-        for d in epic_list:
-            ends = (
-                f" • Ends <t:{int(dtparse.isoparse(d['ends_at']).timestamp())}:R>"
-                if d.get("ends_at")
-                else ""
-            )
-            e.description += f"• [{d['title']}]({d['url']}){ends}\n"
-        embeds.append(e)
-    if steam_list:
-        s = discord.Embed(
-            title=f"Steam — Free Right Now ({region})", description=""
-        )
-        for d in steam_list:
-            s.description += f"• [{d['title']}]({d['url']}) • Ends unknown\n"
-        embeds.append(s)
-
-    await interaction.response.send_message(embeds=embeds)
+    # Cached embeds; only the status lines are per call (Discord renders <t:...:R> relative)
+    messages = freelist_messages(region, snap)
+    await send(
+        content=f"🕒 Updated <t:{int(snap['fetched_at'])}:R>{pending}", embeds=messages[0]
+    )
+    for embeds in messages[1:]:
+        await interaction.followup.send(embeds=embeds)
 
 
 @TREE.command(name="freelist_region", description="Set or view the region (owner/admin only)")
@@ -648,13 +3117,14 @@ async def freelist_region(interaction: discord.Interaction, code: Optional[str]
     if code:
         try:
             await set_guild_region(interaction.guild.id, code.upper())
+            SCHEDULER.request_sync()
             await interaction.response.send_message(
                 f"✅ Region set to **{code.upper()}**", ephemeral=True
             )
         except ValueError as ve:
             await interaction.response.send_message(f"❌ {ve}", ephemeral=True)
     else:
-        settings = await get_guild_settings(interaction.guild.id)
+        settings = get_guild_settings(interaction.guild.id)
         await interaction.response.send_message(
             f"🌍 Current region: **{settings['region']}**", ephemeral=True
         )
@@ -683,6 +3153,7 @@ async def freelist_channel(
         return
 
     await set_guild_channel(interaction.guild.id, channel.id)
+    SCHEDULER.request_sync()
     await interaction.response.send_message(
         f"✅ Announcements will go to {channel.mention}", ephemeral=True
     )
@@ -699,14 +3170,16 @@ async def freelist_poll_now(interaction: discord.Interaction):
     if "error" in summary:
         await interaction.followup.send(f"❌ {summary['error']}", ephemeral=True)
         return
-    await interaction.followup.send(
-        (
-            f"✅ Polled region {summary['region']}.\n"
-            f"Epic: found {summary['found_epic']} (announced {summary['announced_epic']}).\n"
-            f"Steam: found {summary['found_steam']} (announced {summary['announced_steam']})."
-        ),
-        ephemeral=True,
-    )
+    lines = [f"✅ Polled region {summary['region']}."]
+    for name, source in SOURCES.items():
+        if name in summary["errors"]:
+            lines.append(f"{source.label}: ❌ {summary['errors'][name]}")
+        else:
+            lines.append(
+                f"{source.label}: found {summary['found'][name]} "
+                f"(queued {summary['announced'].get(name, 0)} to announce)."
+            )
+    await interaction.followup.send("\n".join(lines), ephemeral=True)
 
 
 @TREE.command(name="freelist_debug", description="Show current fetch diagnostics (owner/admin only)")
@@ -716,40 +3189,46 @@ async def freelist_debug(interaction: discord.Interaction):
         return
     await ensure_owner_admin(interaction)
 
-    settings = await get_guild_settings(interaction.guild.id)
+    settings = get_guild_settings(interaction.guild.id)
     region = settings.get("region", "US")
     await interaction.response.defer(ephemeral=True)
 
-    async with aiohttp.ClientSession(headers={"User-Agent": "freewatch/1.0"}) as session:
-        # Raw feed sizes for quick sanity
-        egs_url = (
-            "https://store-site-backend-static.ak.epicgames.com/freeGamesPromotions?"
-            f"locale=en-US&country={region}&allowCountries={region}"
-        )
-        raw = await try_fetch_json(session, egs_url)
-        if isinstance(raw, dict) and "data" in raw:
-            elems = (
-                (raw.get("data", {}) or {})
-                .get("Catalog", {})
-                .get("searchStore", {})
-                .get("elements", [])
-            )
-            raw_count = len(elems)
-        else:
-            raw_count = 0
-
-        epic = await get_epic_free_promos(session, region)
-        steam = await get_steam_free_promos(session, region)
+    session = get_http_session()
+    # Every source at once, plus each one's raw-feed sanity details
+    debuggable = [s for s in SOURCES.values() if s.debug is not None]
+    (results, errors), details = await asyncio.gather(
+        fetch_sources(region),
+        asyncio.gather(*(s.debug(session, region) for s in debuggable), return_exceptions=True),
+    )
+    details = dict(zip((s.name for s in debuggable), details))
+    for source, deals in results.items():
+        update_snapshot_source(region, source, deals)
 
     # Build ephemeral summary with a few sample titles
-    epic_titles = ", ".join([d["title"] for d in epic[:5]]) or "(none)"
-    steam_titles = ", ".join([d["title"] for d in steam[:5]]) or "(none)"
+    source_lines = []
+    for name, source in SOURCES.items():
+        extra = details.get(name)
+        extra = f"{extra} | " if isinstance(extra, str) else ""
+        if name in errors:
+            source_lines.append(f"{source.label}: {extra}❌ {errors[name]}")
+            continue
+        deals = results[name]
+        partial = " (partial fetch)" if isinstance(deals, PartialDeals) else ""
+        titles = ", ".join([d.title for d in deals[:5]]) or "(none)"
+        source_lines.append(f"{source.label}: {extra}matched freebies: {len(deals)}{partial}")
+        source_lines.append(f"{source.label} sample: {titles}")
+    pool = http_pool_metrics()
+    schedule_lines = []
+    for source, (due, interval) in SCHEDULER.next_runs(region).items():
+        when = f"<t:{int(due)}:R>" if due else "running / not scheduled"
+        schedule_lines.append(f"{source}: next poll {when} (every ~{interval / 60:.0f} min)")
     msg = (
         f"Region: {region}\n"
-        f"Epic feed elements: {raw_count} | matched freebies: {len(epic)}\n"
-        f"Epic sample: {epic_titles}\n"
-        f"Steam matched freebies: {len(steam)}\n"
-        f"Steam sample: {steam_titles}"
+        + "".join(f"{line}\n" for line in source_lines)
+        + f"HTTP pool: {pool['connections_in_use']} in use, {pool['connections_idle']} idle, "
+        f"{pool['connections_opened']} opened, {pool['connections_reused']} reused\n"
+        f"Scheduler: {'; '.join(schedule_lines)}\n"
+        f"Instance: {INSTANCE_ID}, shard {interaction.guild.shard_id} of {BOT.shard_count or 1}"
     )
     await interaction.followup.send(msg, ephemeral=True)
 
@@ -771,20 +3250,107 @@ async def on_app_command_error(
 # ----------------- Lifecycle -----------------
 
 
+async def warm_start():
+    """
+    Load what the previous run left in SQLite before the first poll: region
+    snapshots (so /freelist answers immediately and the scheduler knows
+    what is fresh), guild settings, and conditional-GET validators.
+    """
+    results = await load_all_region_results()
+    for region, source, deals, fetched_at in results:
+        update_snapshot_source(region, source, deals, fetched_at)
+    GUILD_SETTINGS.update(await load_all_guild_settings())
+    HTTP_VALIDATORS.update(await load_http_validators())
+    print(
+        f"[startup] warm: {len(REGION_SNAPSHOTS)} region snapshots, "
+        f"{len(GUILD_SETTINGS)} guild settings, {len(HTTP_VALIDATORS)} feed validators"
+    )
+
+
+def command_tree_hash() -> str:
+    payload = [c.to_dict(TREE) for c in TREE.get_commands()]
+    return hashlib.blake2b(
+        json.dumps(payload, sort_keys=True).encode(), digest_size=16
+    ).hexdigest()
+
+
+async def sync_commands():
+    """TREE.sync() only when the command tree differs from the last synced one."""
+    key = f"command_tree_hash:{BOT.application_id}"
+    digest = command_tree_hash()
+    if not FORCE_COMMAND_SYNC and await get_meta(key) == digest:
+        print("Slash commands unchanged since last sync; skipping.")
+        return
+    synced = await TREE.sync()
+    await set_meta(key, digest)
+    print(f"Synced {len(synced)} slash commands.")
+
+
 @BOT.event
 async def on_ready():
+    # Commands are global: with several shard processes only the one that
+    # runs shard 0 needs to sync them
+    shard_ids = getattr(BOT, "shard_ids", None)
+    if not shard_ids or 0 in shard_ids:
+        try:
+            await sync_commands()
+        except Exception as e:
+            print("Slash sync error:", e)
+    global _scheduler_task, _promo_watcher
+    if _scheduler_task is None or _scheduler_task.done():
+        _scheduler_task = asyncio.create_task(SCHEDULER.run())
+    if not prune_ledger.is_running():
+        prune_ledger.start()
+    if not sweep_deals.is_running():
+        sweep_deals.start()
+    if _promo_watcher is None or _promo_watcher.done():
+        _promo_watcher = asyncio.create_task(promo_boundary_watcher())
+    print(
+        f"Logged in as {BOT.user} (id: {BOT.user.id}) as {INSTANCE_ID}, "
+        f"shards {getattr(BOT, 'shard_ids', None) or 'all'}"
+    )
+
+
+@BOT.event
+async def on_guild_join(guild: discord.Guild):
+    # Rejoining a guild: its stored settings apply again
     try:
-        synced = await TREE.sync()
-        print(f"Synced {len(synced)} slash commands.")
+        await load_guild_settings(guild.id)
     except Exception as e:
-        print("Slash sync error:", e)
-    if not poll_deals.is_running():
-        poll_deals.start()
-    print(f"Logged in as {BOT.user} (id: {BOT.user.id})")
+        print(f"[settings] guild {guild.id} load error: {e}")
+    SCHEDULER.request_sync()
+
+
+@BOT.event
+async def on_guild_remove(guild: discord.Guild):
+    # The row stays in SQLite in case the bot is re-added
+    evict_guild_settings(guild.id)
+    SCHEDULER.request_sync()
+
+
+async def main():
+    await init_db()
+    await warm_start()
+    await open_http_session()
+    DISPATCHER.start()
+    metrics_runner = await start_metrics_server()
+    try:
+        async with BOT:
+            await BOT.start(DISCORD_TOKEN)
+    finally:
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+        await DISPATCHER.stop()
+        await close_http_session()
+        await DB.close()
 
 
 if __name__ == "__main__":
     if not DISCORD_TOKEN:
         raise SystemExit("Set DISCORD_TOKEN in your environment.")
-    asyncio.run(init_db())
-    BOT.run(DISCORD_TOKEN)
+    # BOT.run() normally does this; keep discord.py's default log output
+    discord.utils.setup_logging()
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass